@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import daily_data
+import warnings
+import glob
+import os
+import re
+
+'''
+Prepares a whole folder of SALT reports at once, i.e. when backfilling a week or a month of
+missed days. Every report is parsed in its own process, and each one produces the same readable
+sheet for manual entry as 'run_daily_data.py -m', plus a work list of the clients to be automated.
+Automation itself still has to be run one report at a time, since it shares a single HMIS login.
+'''
+class BatchData:
+    report_extensions = ('.xlsx', '.csv', '.parquet')
+
+    def __init__(self, path, show_output, location, list_items, processes=None):
+        self.show_output = show_output
+        self.location = location
+        self.list_items = list_items
+        self.processes = processes
+
+        # accept either a folder of reports or a glob i.e. '~/Downloads/Report_by_client_02-*.xlsx'
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "*")
+        self.filenames = sorted(filename for filename in glob.glob(path)
+                                if filename.lower().endswith(self.report_extensions)
+                                and re.search("[0-9]{2}-[0-9]{2}-[0-9]{4}", os.path.basename(filename)))
+        if not self.filenames:
+            print("No reports with a date in their filename were found in " + path)
+            quit()
+
+    # Parse every report in parallel
+    # @return: [list] filenames of the reports that couldn't be processed
+    def read_and_process_data(self):
+        print("Processing " + str(len(self.filenames)) + " reports")
+        failed_filenames = []
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = {executor.submit(prepare_report, filename, self.show_output, self.location, self.list_items): filename
+                       for filename in self.filenames}
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    print("Error processing " + filename)
+                    print(e)
+                    success = False
+
+                if success:
+                    print("Finished processing " + os.path.basename(filename))
+                else:
+                    failed_filenames.append(filename)
+
+        if failed_filenames:
+            print("Couldn't process " + str(len(failed_filenames)) + " report(s):")
+            for filename in sorted(failed_filenames):
+                print(filename)
+        return failed_filenames
+
+# Runs in a separate process for every report, has to be at the top level of the module to be picklable
+# @return: [bool] success / fail
+def prepare_report(filename, show_output, location, list_items):
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            dd = daily_data.DailyData(filename, False, True, show_output, location, list_items, work_list=True)
+            dd.read_and_process_data()
+    except SystemExit:
+        # DailyData quits on empty reports and missing settings
+        return False
+    return True
@@ -0,0 +1,73 @@
+import report_generator
+import daily_data
+import tempfile
+import warnings
+import json
+import os
+
+'''
+Times each stage of DailyData (ingestion, parsing, category rollup and export) on generated
+reports of different sizes, with automation turned off. Results are reported as rows per second,
+and can be saved and compared against an earlier run to catch slowdowns before the nightly run.
+'''
+class Benchmark:
+    stages = ['ingestion', 'parsing', 'rollup', 'export']
+
+    def __init__(self, location, sizes, repeat=3, extension=".xlsx"):
+        self.location = location if location else "ORL"
+        self.sizes = sizes
+        self.repeat = repeat
+        self.extension = extension
+
+    # Runs every size and keeps the fastest of the repeated runs for each stage
+    # @return: [dict] rows per second for each stage, by report size
+    def run(self):
+        results = {}
+        working_directory = os.getcwd()
+        with tempfile.TemporaryDirectory() as sandbox:
+            # DailyData reads its settings relative to the working directory
+            os.makedirs(os.path.join(sandbox, "salt"))
+            with open(os.path.join(sandbox, "salt", "settings.json"), 'w') as f:
+                json.dump({"data": [{"hmis_username": "", "hmis_password": "",
+                                     "output_path": sandbox + os.sep}]}, f)
+            os.chdir(sandbox)
+            try:
+                for size in self.sizes:
+                    results[str(size)] = self.__run_size(size, sandbox)
+            finally:
+                os.chdir(working_directory)
+        return results
+
+    def __run_size(self, size, sandbox):
+        generator = report_generator.ReportGenerator(self.location, size)
+        filename = generator.write(sandbox, "01-01-2024", self.extension)
+
+        best = {}
+        for i in range(self.repeat):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                dd = daily_data.DailyData(filename, False, True, False, self.location, False)
+                dd.read_and_process_data()
+            for stage in self.stages:
+                best[stage] = min(best.get(stage, float('inf')), dd.timings[stage])
+
+        rows_per_second = {stage: size / max(seconds, 1e-9) for stage, seconds in best.items()}
+        print(str(size) + " rows: " + ", ".join("%s %.0f rows/s (%.1f ms)" % (stage, rows_per_second[stage], best[stage] * 1000)
+                                                 for stage in self.stages))
+        return rows_per_second
+
+# Compares results with a baseline from an earlier run
+# @param: [dict] results: results of 'Benchmark.run'
+#         [dict] baseline: results of an earlier run
+#         [float] tolerance: how much slower a stage can be before it counts as a regression, i.e. 0.25 = 25%
+# @return: [list] descriptions of every stage that got slower
+def find_regressions(results, baseline, tolerance):
+    regressions = []
+    for size, stages in results.items():
+        for stage, rows_per_second in stages.items():
+            if size not in baseline or stage not in baseline[size]:
+                continue
+            expected = baseline[size][stage]
+            if rows_per_second < expected * (1 - tolerance):
+                regressions.append("%s rows, %s: %.0f rows/s, baseline %.0f rows/s" % (size, stage, rows_per_second, expected))
+    return regressions
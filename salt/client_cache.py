@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+import name_matcher
+import sqlite3
+import threading
+
+'''
+Remembers which HMIS client each SALT client turned out to be, so a client that comes back
+another day doesn't have to be searched for by birthday and picked out of the list of results
+again. A client with a remembered HMIS ID goes straight to a search by ID, and a name that
+was already checked against that client's dashboard doesn't have to be scored again. The SALT
+enrollment each client's services go under is remembered for each location as well, so it can be
+picked straight away instead of looking through all of the client's enrollments.
+
+Every entry keeps how confident the match was, only confident matches are used, and entries
+that haven't been used in a while are dropped. An entry that leads to the wrong client or to
+no client at all is forgotten, so the client is searched for the long way again.
+'''
+class ClientCache:
+    # a match has to be at least this confident to be used, same as picking a search result
+    min_confidence = name_matcher.min_result_score / 2
+    # entries that haven't been used in this many days are dropped
+    max_age = 180
+
+    # @param: [str] filename: SQLite database the cache is kept in
+    def __init__(self, filename):
+        # every HMIS session uses the cache from its own thread
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS clients (
+                                       name TEXT, dob TEXT, client_id TEXT, confidence REAL,
+                                       hits INTEGER, used_at TEXT,
+                                       PRIMARY KEY (name, dob))''')
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS verified_names (
+                                       client_id TEXT, name TEXT, dashboard_first_name TEXT,
+                                       dashboard_last_name TEXT, confidence REAL, used_at TEXT,
+                                       PRIMARY KEY (client_id, name))''')
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS enrollments (
+                                       client_id TEXT, location TEXT, option_value TEXT, enrollment_name TEXT,
+                                       created_at TEXT, used_at TEXT,
+                                       PRIMARY KEY (client_id, location))''')
+        self.__evict()
+
+    # @param: [str] first_name: first name in SALT
+    #         [str] last_name: last name in SALT
+    #         [str] dob: birthday in format MM-DD-YYYY
+    # @return: [str] HMIS ID the client was found as before, None if they haven't been found confidently
+    def find_client_id(self, first_name, last_name, dob):
+        with self.lock:
+            found = self.connection.execute('SELECT client_id FROM clients WHERE name = ? AND dob = ? AND confidence >= ?',
+                                            (self.__name(first_name, last_name), dob, self.min_confidence)).fetchone()
+        return found[0] if found else None
+
+    # @param: [str] client_id: HMIS ID
+    #         [str] first_name: first name in SALT
+    #         [str] last_name: last name in SALT
+    # @return: [tuple] (first name, last name) on the client's dashboard when it was checked against this
+    #                  name before, None if it hasn't been
+    def find_verified_name(self, client_id, first_name, last_name):
+        with self.lock:
+            found = self.connection.execute('''SELECT dashboard_first_name, dashboard_last_name FROM verified_names
+                                               WHERE client_id = ? AND name = ? AND confidence >= ?''',
+                                            (client_id, self.__name(first_name, last_name), self.min_confidence)).fetchone()
+        return tuple(found) if found else None
+
+    # Remembers the client a SALT client was found as, called every time they're found so entries
+    #   that are still in use aren't dropped
+    # @param: [str] first_name: first name in SALT
+    #         [str] last_name: last name in SALT
+    #         [str] dob: birthday in format MM-DD-YYYY, None if the client was found by ID
+    #         [tuple] client: (HMIS ID, dashboard first name, dashboard last name, confidence) of the client found
+    def remember(self, first_name, last_name, dob, client):
+        client_id, dashboard_first_name, dashboard_last_name, confidence = client
+        name = self.__name(first_name, last_name)
+        now = self.__now()
+        with self.lock:
+            if dob:
+                self.connection.execute('''INSERT INTO clients VALUES (?, ?, ?, ?, 1, ?)
+                                           ON CONFLICT (name, dob) DO UPDATE SET client_id = excluded.client_id,
+                                               confidence = excluded.confidence, hits = hits + 1, used_at = excluded.used_at''',
+                                        (name, dob, client_id, confidence, now))
+            self.connection.execute('INSERT OR REPLACE INTO verified_names VALUES (?, ?, ?, ?, ?, ?)',
+                                    (client_id, name, dashboard_first_name, dashboard_last_name, confidence, now))
+            self.connection.commit()
+
+    # Forgets a client that couldn't be found with what was remembered
+    # @param: [str] first_name: first name in SALT
+    #         [str] last_name: last name in SALT
+    #         [str] dob: birthday in format MM-DD-YYYY, None to only forget the checked name
+    #         [str] client_id: HMIS ID that was remembered
+    def forget(self, first_name, last_name, dob, client_id):
+        name = self.__name(first_name, last_name)
+        with self.lock:
+            if dob:
+                self.connection.execute('DELETE FROM clients WHERE name = ? AND dob = ?', (name, dob))
+            self.connection.execute('DELETE FROM verified_names WHERE client_id = ? AND name = ?', (client_id, name))
+            self.connection.commit()
+
+    # @param: [str] client_id: HMIS ID
+    #         [str] location: location code i.e. ORL
+    # @return: [str] option value of the enrollment the client's services were entered under, None if there isn't one
+    def find_enrollment(self, client_id, location):
+        with self.lock:
+            found = self.connection.execute('SELECT option_value FROM enrollments WHERE client_id = ? AND location = ?',
+                                            (client_id, location)).fetchone()
+        return found[0] if found else None
+
+    # Remembers the enrollment a client's services were entered under
+    # @param: [str] client_id: HMIS ID
+    #         [str] location: location code i.e. ORL
+    #         [tuple] enrollment: (option value, name) of the enrollment
+    def remember_enrollment(self, client_id, location, enrollment):
+        option_value, enrollment_name = enrollment
+        now = self.__now()
+        with self.lock:
+            # keep when the enrollment was first seen, unless it's a different enrollment now
+            self.connection.execute('''INSERT INTO enrollments VALUES (?, ?, ?, ?, ?, ?)
+                                       ON CONFLICT (client_id, location) DO UPDATE SET
+                                           created_at = CASE WHEN option_value = excluded.option_value
+                                                             THEN created_at ELSE excluded.created_at END,
+                                           option_value = excluded.option_value, enrollment_name = excluded.enrollment_name,
+                                           used_at = excluded.used_at''',
+                                    (client_id, location, option_value, enrollment_name, now, now))
+            self.connection.commit()
+
+    # Forgets an enrollment that couldn't be picked, i.e. the client was exited from it
+    # @param: [str] client_id: HMIS ID
+    #         [str] location: location code i.e. ORL
+    def forget_enrollment(self, client_id, location):
+        with self.lock:
+            self.connection.execute('DELETE FROM enrollments WHERE client_id = ? AND location = ?', (client_id, location))
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __evict(self):
+        oldest = (datetime.now() - timedelta(days=self.max_age)).isoformat(timespec='seconds')
+        with self.lock:
+            evicted = (self.connection.execute('DELETE FROM clients WHERE used_at < ?', (oldest,)).rowcount
+                       + self.connection.execute('DELETE FROM verified_names WHERE used_at < ?', (oldest,)).rowcount)
+            self.connection.execute('DELETE FROM enrollments WHERE used_at < ?', (oldest,))
+            self.connection.commit()
+        if evicted:
+            print("Dropped " + str(evicted) + " clients from the cache that haven't been seen in " + str(self.max_age) + " days")
+
+    def __name(self, first_name, last_name):
+        return name_matcher.normalize(first_name + " " + last_name)
+
+    def __now(self):
+        return datetime.now().isoformat(timespec='seconds')
@@ -1,8 +1,19 @@
 from datetime import datetime
 import re
-import hmis_driver
+import item_catalog
+import spreadsheet_reader
+import entry_journal
+import report_fingerprints
+import session_pool
+import wait_timeouts
+import client_cache
+import service_ledger
 import pandas as pd
 import json
+import os
+import queue
+import threading
+import time
 
 '''
 Processes the data from the SALT Web App and preps it for Selenium automation 
@@ -11,30 +22,16 @@ This will likely be very subject to change as the report style changes with
 SALT 2.0. 
 '''
 class DailyData:
-    # Orlando Item Keys
-    service_item_codes_orl = ['Shower', 'Laundry']
-    clothing_item_codes_orl = ['TOP', 'BTM', 'UND', 'SKS', 'SHO', 'BXR', 'Diabetic Socks', 'Backpacks', 'Belts']
-    grooming_item_codes_orl = ['DDR', 'TBR', 'TPS', 'Razors', 'Adult Depends', 'Band Aid', 'Tampons', 'Bar Soap', 
-                               'Deodorant', 'QTIPS', 'Hygiene Bag', 'Comb', 'Nail Clippers', 'Q-tips', 'Conditioner',
-                               'Chapstick']
-    food_item_codes_orl = ['SBG']
-    bedding_item_codes_orl = ['Blankets']
-
-    # Sanford Item Keys
-    service_item_codes_sem = ['Shower', 'Laundry']
-    clothing_item_codes_sem = ['Black Bags', 'Men\'s pant', 'Men\'s Top', 'Shoes', 'Socks', 'Underwear', 
-                           'Women\'s Bottom', 'Women\'s Top', 'Boxer']
-    grooming_item_codes_sem = ['Feminine pads', 'Hygiene Bag', 'Razors', 'Soap bars', 'Tampons', 'Toothbrush',
-                           'Toothpaste', 'Deodorant']
-    food_item_codes_sem = ['Snack', 'Water']
-    bedding_item_codes_sem = ['Tent', 'Blankets']
-
     # Locations
-    location_codes = ["SEM", "ORL"]
+    location_codes = list(item_catalog.catalogs.keys())
+
+    # max number of clients waiting to be automated at once
+    queue_size = 50
 
-    def __init__(self, filename, automate, manual, show_output, location, list_items):
+    def __init__(self, filename, automate, manual, show_output, location, list_items, work_list=False, sessions=1):
         self.automate = automate
         self.manual = manual
+        self.work_list = work_list
         self.show_output = show_output
         self.list_items = list_items
         self.unique_items = set()
@@ -43,23 +40,16 @@ class DailyData:
         if self.location not in self.location_codes:
             print("Not a valid location code, please see README for details")
             quit()
+        self.item_matcher = item_catalog.ItemMatcher(self.location)
 
-        self.df = pd.read_excel(io=filename,
-                             dtype={'': object,
-                                    'DoB': object,
-                                    'Client Name': object,
-                                    'HMIS ID': object,
-                                    'Race': object,
-                                    'Ethnicity': object,
-                                    'Verification of homeless': object,
-                                    'Gross monthly income': object,
-                                    'Service': object,
-                                    'Items': object})
-        if self.df.empty:
-            print("No data to enter into HMIS today, closing now")
-            quit()
+        # every browser session needs its own share of the machine, more than one per core only slows them all down
+        self.sessions = max(1, sessions)
+        if self.sessions > os.cpu_count():
+            print("Only " + str(os.cpu_count()) + " cores available, using " + str(os.cpu_count()) + " HMIS sessions")
+            self.sessions = os.cpu_count()
 
-        self.failed_df = self.df.copy()
+        # time spent in each stage of processing, in seconds
+        self.timings = {}
 
         try:
             filename = "./salt/settings.json"
@@ -70,113 +60,298 @@ class DailyData:
             quit()
 
         settings = data["data"][0]
-        self.username = settings["hmis_username"]
-        self.password = settings["hmis_password"]
         self.output_path = settings["output_path"]
+        # sessions take turns using every HMIS login in the settings
+        self.credentials = [(login["hmis_username"], login["hmis_password"])
+                            for login in data["data"] if login.get("hmis_username")]
 
     # Parse each row and process client data
     def read_and_process_data(self):
         if self.automate:
-            self.driver = hmis_driver.Driver()
-            self.driver.open_clienttrack()
-            if not self.driver.login_clienttrack(self.username, self.password):
-                print("Could not login successfully")
-                return
+            # skip re-downloads of a report that has already been entered completely
+            date = self.__get_date_from_filename(self.filename)
+            self.fingerprints = report_fingerprints.ReportFingerprints(self.output_path + "processed_reports.db",
+                                                                       self.location, date.strftime('%m-%d-%Y'))
+            file_hash = report_fingerprints.hash_file(self.filename)
+            if self.fingerprints.file_processed(file_hash):
+                # the manual sheet and work list are still wanted for a re-download
+                self.fingerprints.close()
+                self.automate = False
+                if not self.manual and not self.work_list and not self.list_items:
+                    print("This report has already been entered into HMIS, closing now")
+                    return
+                print("This report has already been entered into HMIS, skipping automation")
+        if self.automate:
+            # every service saved in HMIS, so a retry only enters what's still missing
+            self.ledger = service_ledger.ServiceLedger(self.output_path + "service_ledger.db",
+                                                       self.location, date.strftime('%m-%d-%Y'))
+
+            # start the browsers and login in the background while the report is being read and parsed
+            self.timeouts = wait_timeouts.WaitTimeouts(self.output_path + "hmis_wait_timeouts.json")
+            self.pool = session_pool.SessionPool(self.credentials, self.sessions, self.timeouts)
+            self.pool.start()
+            # HMIS IDs of clients found by their birthday on earlier runs
+            self.client_cache = client_cache.ClientCache(self.output_path + "client_cache.db")
+
+        start_time = time.perf_counter()
+        self.df = spreadsheet_reader.read_spreadsheet(self.filename,
+                             dtype={'': object,
+                                    'DoB': object,
+                                    'Client Name': object,
+                                    'HMIS ID': object,
+                                    'Race': object,
+                                    'Ethnicity': object,
+                                    'Verification of homeless': object,
+                                    'Gross monthly income': object,
+                                    'Service': object,
+                                    'Items': object})
+        self.timings['ingestion'] = time.perf_counter() - start_time
+        if self.df.empty:
+            print("No data to enter into HMIS today, closing now")
+            if self.automate:
+                self.__close_automation()
+            quit()
+
+        self.failed_df = self.df.copy()
 
         self.__clean_dataframe(['Race', 'Ethnicity', 'Verification of homeless', 'Gross monthly income'], 
                                ['', 'HMIS ID', 'Client Name', 'Service', 'Items', 'DoB'])
 
-        # add new column combining items and services columns
-        self.df['Services'] = ""
-        for row_index in range(0, len(self.df)):
-            # build dictionary datatype for client to pass into automation
-            client_dict = {}
-            row = self.df.iloc[row_index]
-
-            # rearrange birthday and update row
-            if not isinstance(row['DoB'], float):
-                if isinstance(row['DoB'], datetime):
-                    date = row['DoB'].strftime('%m-%d-%Y')
-                else:
-                    date = row['DoB']
-
-                day = date[0:3]
-                month = date[3:6]
-                client_dict['DoB'] = month + day + date[6:(len(date))]
-                # # update sheet for readability
-                self.df.at[row_index, 'DoB'] = client_dict['DoB']
-                '''
-                client_dict['DoB'] = date
-                self.df.at[row_index, 'DoB'] = client_dict['DoB']
-                '''
-
-            # get total number of services and items
-            services_dict = self.__get_service_totals(row)
-            items_dict = self.__count_item_totals(row, services_dict)
-            client_dict['Services'] = {**services_dict, **items_dict}
-            # update sheet for readability
-            self.df.at[row_index, 'Services'] = self.__clean_dictionary_string(str(client_dict['Services']))
-
-            # split name into first and last and strip any trailing whitespaces and nicknames in quotes
-            # an entry like "Edward Powell James" -> "Edward Powell, James" (Last, First)
-            # no_quotes_name = re.sub('(".*")', "", row['Client Name'])
-            # OR:
-            # just remove quotes, as it might be a potential middle name
-            no_quotes_name = row['Client Name'].replace('"', '')
-            stripped_name = no_quotes_name.strip()
-            string_list = stripped_name.rsplit(' ', 1)
-            if len(string_list) > 1:
-                client_dict['First Name'] = string_list[1]
-            else:
-                client_dict['First Name'] = ''
-            client_dict['Last Name'] = string_list[0]
-
-            # add remaining client info
-            client_dict['Client ID'] = row['HMIS ID']
-
-            if self.show_output:
-                print()
-                print("Final Dictionary Output:")
-                print(client_dict)
-                print("-----------------------------")
-
-            # automate data entry for current client (as represented by the current row)
+        # parse the services and items of every row at once and add new column combining them
+        start_time = time.perf_counter()
+        totals = self.__get_service_and_item_totals()
+        self.df['Services'] = [self.__clean_dictionary_string(str(services_dict)) 
+                               for services_dict in self.__get_services_dicts(totals)]
+        self.timings['parsing'] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        self.__normalize_client_identity()
+        visits = self.__collapse_duplicate_clients(totals)
+        self.timings['rollup'] = time.perf_counter() - start_time
+        if self.work_list:
+            self.__export_work_list(visits)
+        if self.automate:
+            visits = self.__get_visit_deltas(visits)
+
+            # entering starts as soon as the first session is logged in, the others join in as they log in
+            if not self.pool.wait_until_ready():
+                print("Could not login successfully")
+                self.__close_automation()
+                return
+            # keep track of every entry that's been completed, the failed entries are exported from it at the end
+            self.journal = entry_journal.EntryJournal(self.output_path + self.__get_failed_entries_name() + ".jsonl",
+                                                      os.path.abspath(self.filename))
+
+        # client dictionaries are built in the background and handed to automation as soon as each one is ready
+        client_queue = queue.Queue(maxsize=self.queue_size)
+        producer_thread = threading.Thread(target=self.__produce_client_dicts, args=(visits, client_queue), daemon=True)
+        producer_thread.start()
+        try:
+            self.__process_visits(client_queue)
+        finally:
+            # export the failed entries once, even if the run was interrupted
             if self.automate:
-                self.__automate_service_entry(client_dict, row_index)
-        # For Loop End
+                self.__export_failed_automation_data()
+                self.journal.finish()
+                self.timeouts.save()
+                self.pool.close()
+                self.client_cache.close()
+                self.ledger.close()
+
+        if self.automate:
+            if self.failed_df.empty:
+                self.fingerprints.mark_file_processed(file_hash)
+            self.fingerprints.close()
 
         if self.list_items:
             print(self.unique_items)
 
         # Make data more readable for manual data entry
         if self.manual:
+            start_time = time.perf_counter()
             self.__clean_dataframe(['Service', 'Items'], ['', 'HMIS ID', 'Client Name', 'Services', 'DoB'])
             self.__export_manual_entry_data()
+            self.timings['export'] = time.perf_counter() - start_time
+
+    # Closes the browsers and every store opened for automation, when the run ends before entering anything
+    def __close_automation(self):
+        self.pool.close()
+        self.client_cache.close()
+        self.ledger.close()
+        self.fingerprints.close()
+
+    # Builds the client dictionary for each visit and puts it in the queue, runs on its own thread
+    # @param: [DataFrame] visits: one row per client visit, see '__collapse_duplicate_clients'
+    #         [Queue] client_queue: queue of (visit, client dictionary) to be processed, ends with None
+    def __produce_client_dicts(self, visits, client_queue):
+        try:
+            for visit in visits.itertuples():
+                # build dictionary datatype for client to pass into automation
+                client_dict = {}
+                if not pd.isna(visit.dob):
+                    client_dict['DoB'] = visit.dob.strftime('%m-%d-%Y')
+                client_dict['Services'] = visit.services
+                client_dict['First Name'] = visit.first_name
+                client_dict['Last Name'] = visit.last_name
+                client_dict['Client ID'] = visit.client_id
+                client_queue.put((visit, client_dict))
+        finally:
+            client_queue.put(None)
+
+    # Takes each client dictionary out of the queue and enters it into HMIS when automating, every
+    #   HMIS session works on its own thread and the results are recorded here as they come in
+    # @param: [Queue] client_queue: queue of (visit, client dictionary) to be processed, ends with None
+    def __process_visits(self, client_queue):
+        if not self.automate:
+            while True:
+                item = client_queue.get()
+                if item is None:
+                    break
+                self.__process_visit(None, item)
+            return
+
+        results_queue = queue.Queue()
+        self.pool.run(client_queue, self.__process_visit, results_queue)
+        while True:
+            result = results_queue.get()
+            if result is None:
+                break
+            (visit, client_dict), success = result
+            # skipped over, already completed by an earlier run that didn't finish
+            if success is None:
+                continue
+
+            if success and visit.status != 'unchanged':
+                self.fingerprints.record_client(visit.key, visit.all_services)
+            for row_index in visit.rows:
+                self.journal.record(row_index, success, client_dict['First Name'] + " " + client_dict['Last Name'])
+            if success:
+                remaining = len(self.failed_df.index) - len(self.journal.successful_rows)
+                print("Success! " + str(remaining) + " entries remaining")
+        # While Loop End
+
+    # Enters a single client visit, runs on the thread of the HMIS session it was given to
+    # @param: [Driver] driver: the HMIS session to enter the client with, None when not automating
+    #         [tuple] item: (visit, client dictionary)
+    # @return: [bool] success / fail, None if the visit was skipped
+    def __process_visit(self, driver, item):
+        visit, client_dict = item
+        if self.show_output:
+            print("Raw Excel Data:")
+            print("SERVICES")
+            print(visit.Service)
+            print("ITEMS")
+            print(visit.Items)
+            print()
+            print("Final Dictionary Output:")
+            print(client_dict)
+            print("-----------------------------")
+
+        # automate data entry for current client (as represented by the current visit)
+        # skip over any entries already completed by an earlier run that didn't finish
+        if not self.automate or set(visit.rows).issubset(self.journal.successful_rows):
+            return None
+        # nothing has been added since the client was entered from an earlier export of the report
+        if visit.status != 'new' and not visit.services:
+            return True
+        # log back in and try the client again if the session expires partway through
+        return driver.run_step(self.__automate_service_entry, driver, client_dict, visit)
+
+    # Compares each visit with what was entered the last time a report for the same date was run,
+    #   so that only new clients and the increase in counts for changed clients are entered
+    # @param: [DataFrame] visits: one row per client visit, see '__collapse_duplicate_clients'
+    # @return: [DataFrame] visits with the 'services' left to be entered, 'all_services' and the 'status' of each visit
+    def __get_visit_deltas(self, visits):
+        visits['all_services'] = visits['services']
+        deltas = [self.fingerprints.get_delta(key, services) for key, services in zip(visits['key'], visits['services'])]
+        visits['status'] = [status for status, delta in deltas]
+        visits['services'] = [delta for status, delta in deltas]
+
+        counts = visits['status'].value_counts()
+        if counts.get('unchanged', 0) or counts.get('changed', 0):
+            print("Report has been run before: " + str(counts.get('new', 0)) + " new, " 
+                  + str(counts.get('changed', 0)) + " changed and " + str(counts.get('unchanged', 0)) 
+                  + " unchanged clients")
+        return visits
+
+    # Combines the rows of clients that checked in more than once that day into a single visit, so
+    #   each client is only searched for and entered into HMIS once. Clients are matched by their HMIS ID,
+    #   or by their name and birthday when there's no ID
+    # @param: [DataFrame] totals: total of each service for each row
+    # @return: [DataFrame] one row per visit, with the identity columns of the first row of each client,
+    #                      the combined 'services' dictionary, the indexes of the original 'rows'
+    #                      and the 'key' the client was matched by
+    def __collapse_duplicate_clients(self, totals):
+        names = (self.df['first_name'] + " " + self.df['last_name']).str.lower()
+        names = names.str.replace(r'[^a-z ]', '', regex=True).str.split().str.join(" ")
+
+        # rows that can't be matched to another row keep a key of their own
+        key = "row:" + self.df.index.to_series().astype(str)
+        key = key.where(self.df['dob'].isna(), "name:" + names + "|" + self.df['dob'].dt.strftime('%Y-%m-%d'))
+        key = key.where(self.df['client_id'] == "", "id:" + self.df['client_id'])
+
+        grouped_rows = self.df.index.to_series().groupby(key, sort=False).agg(list)
+        grouped_totals = totals.groupby(key, sort=False).sum().loc[grouped_rows.index]
+
+        visits = self.df.loc[[rows[0] for rows in grouped_rows],
+                             ['Service', 'Items', 'dob', 'first_name', 'last_name', 'client_id']]
+        visits['services'] = self.__get_services_dicts(grouped_totals)
+        visits['rows'] = list(grouped_rows)
+        visits['key'] = list(grouped_rows.index)
+
+        # report which rows were merged together
+        if len(visits.index) < len(self.df.index):
+            print("Merged " + str(len(self.df.index)) + " rows into " + str(len(visits.index)) + " client visits")
+        if self.show_output:
+            for rows, first_name, last_name in zip(visits['rows'], visits['first_name'], visits['last_name']):
+                if len(rows) > 1:
+                    print("Merged rows " + ", ".join(str(row) for row in rows) + " into one visit for " 
+                          + first_name + " " + last_name)
+        return visits
+
+    # @param: [Driver] driver: the HMIS session to enter the client with
+    #         [dict] client_dict: client to be entered
+    #         [tuple] visit: the client's visit, services are recorded in the ledger under its key
+    # @return: [bool] success / fail
+    def __automate_service_entry(self, driver, client_dict, visit):
+        # some services may have been saved by an earlier try that failed partway through the client,
+        #   checked on every try so a retry after logging back in doesn't enter them again
+        client_dict['Services'] = self.ledger.get_missing(visit.key, visit.services, visit.all_services)
+        client_dict['All Services'] = visit.all_services
+        if visit.services and not client_dict['Services']:
+            print(client_dict['First Name'] + " " + client_dict['Last Name'] + "'s services have all been entered already")
+            return True
 
-    def __automate_service_entry(self, client_dict, row_index):
         print("\nEntering Client:" + client_dict['First Name'], client_dict['Last Name'])
         success = False
         # STEP ONE: SEARCH FOR CLIENT
         # Search by ID
-        if not isinstance(client_dict['Client ID'], float) and client_dict['Client ID'] != "":
-            success = self.driver.search_client_by_ID(client_dict['Client ID'], client_dict['First Name'], client_dict['Last Name'])
+        if client_dict['Client ID'] != "":
+            success = self.__search_client_by_ID(driver, client_dict['Client ID'], client_dict)
         # Search by DoB
-        elif 'DoB' not in client_dict:
-            print("Neither birthday or ID in data, can't search for client:")
-            print(client_dict)
-            return
-        elif not isinstance(client_dict['DoB'], float) and client_dict['DoB'] != "":
-            success = self.driver.search_client_by_birthdate(client_dict['DoB'], client_dict['First Name'], client_dict['Last Name'])
+        elif 'DoB' in client_dict:
+            # clients found by their birthday before can be searched by ID instead
+            cached_id = self.client_cache.find_client_id(client_dict['First Name'], client_dict['Last Name'], client_dict['DoB'])
+            if cached_id:
+                print("Found client in cache as HMIS ID " + cached_id)
+                success = self.__search_client_by_ID(driver, cached_id, client_dict)
+                if not success:
+                    print("Cached HMIS ID didn't work, searching by birthday instead")
+                    self.client_cache.forget(client_dict['First Name'], client_dict['Last Name'], client_dict['DoB'], cached_id)
+            if not success:
+                success = driver.search_client_by_birthdate(client_dict['DoB'], client_dict['First Name'], client_dict['Last Name'])
         # Lack of Info
         else:
-            print("Not enough data provided to search for client:")
+            print("Neither birthday or ID in data, can't search for client:")
             print(client_dict)
-            return
+            return False
 
         if not success:
             print("Client could not be found in the system:")
             print(client_dict)
-            return
+            return False
+        if driver.client:
+            self.client_cache.remember(client_dict['First Name'], client_dict['Last Name'], client_dict.get('DoB'), driver.client)
         
         # STEP TWO: ENTER SERVICES FOR CLIENT
         # order matters - from most desirable option to last
@@ -190,16 +365,33 @@ class DailyData:
         date = self.__get_date_from_filename(self.filename)
         service_date = str(date.strftime('%m%d%Y'))
 
+        # the enrollment the client's services went under last time is picked straight away
+        client_id = driver.client[0] if driver.client else None
+        enrollment = self.client_cache.find_enrollment(client_id, self.location) if client_id else None
+
         # enter client services for client - expects date with no non-numeric values (no dashes, etc.)``
-        success = self.driver.enter_client_services(salt_enrollment_names, service_date, client_dict['Services'], self.location)
+        success = driver.enter_client_services(salt_enrollment_names, service_date, client_dict['Services'], self.location,
+                                               enrollment, lambda service, units: self.ledger.record(visit.key, service, units),
+                                               client_dict['All Services'])
+        if client_id and driver.enrollment:
+            self.client_cache.remember_enrollment(client_id, self.location, driver.enrollment)
+        elif enrollment and driver.enrollment_rejected:
+            self.client_cache.forget_enrollment(client_id, self.location)
         if not success:
             print("Client services could not be entered into the system:")
             print(client_dict)
-            return
-        # remove client from list of failed automated entries
-        self.failed_df = self.failed_df.drop([row_index])
-        print("Success! " + str(len(self.failed_df.index)) + " entries remaining")
-        self.__export_failed_automation_data()
+            return False
+        return True
+
+    # Searches for a client by ID, skipping the name check if the name was already checked against
+    #   the same client on an earlier run
+    # @param: [Driver] driver: the HMIS session to search with
+    #         [str] client_id: HMIS ID to search for
+    #         [dict] client_dict: client being searched for
+    # @return: [bool] success / fail
+    def __search_client_by_ID(self, driver, client_id, client_dict):
+        verified_name = self.client_cache.find_verified_name(client_id, client_dict['First Name'], client_dict['Last Name'])
+        return driver.search_client_by_ID(client_id, client_dict['First Name'], client_dict['Last Name'], verified_name)
 
     # Remove unecessary columns and reorganize for easier entry
     def __clean_dataframe(self, drop_columns, reorder_columns):
@@ -207,191 +399,68 @@ class DailyData:
         reorder = reorder_columns
         self.df = self.df.reindex(columns=reorder)
 
-    # Convert row values to proper data types and return a dictionary
-    def __get_service_totals(self, row):
-        services_dict = {}
-
-        if isinstance(row['Service'], float):
-            return services_dict
-        else:
-            index = row['Service'].find('Shower')
-            if index >= 0:
-                # find num value attributed to shower
-                string_list = row['Service'].split('Shower')
-                substring = string_list[1]
-
-                # get first ':' following 'Shower'
-                i = substring.index(':')
-                services_dict['Shower'] = int(substring[i+2])
-
-            index = row['Service'].find('Laundry')
-            if index >= 0:
-                # find num value attributed to laundry
-                string_list = row['Service'].split('Laundry')
-                substring = string_list[1]
-
-                # get first ':' following 'Laundry' ()
-                # multiply laundry x2 (one wash, one dry)
-                i = substring.index(':')
-                services_dict['Laundry'] = int(substring[i+2]) * 2
-
-            index = row['Service'].find('Case Management')
-            if index >= 0:
-                # find num value attributed to laundry
-                string_list = row['Service'].split('Case Management')
-                substring = string_list[1]
-
-                # get first ':' following 'Laundry' ()
-                # multiply laundry x2 (one wash, one dry)
-                i = substring.index(':')
-                services_dict['Case Management'] = int(substring[i+2])
-
-        return services_dict
-
-    # Collect total number of items under each category for each client
-    # and store all items into a dictionary
-    def __count_item_totals(self, row, services_dict):
-        items_dict = {}
-        row_items = row['Items']
-
-        if self.location == 'ORL':
-            clothing_item_codes = DailyData.clothing_item_codes_orl
-            grooming_item_codes = DailyData.grooming_item_codes_orl
-            food_item_codes = DailyData.food_item_codes_orl
-            bedding_item_codes = DailyData.bedding_item_codes_orl
-        elif self.location == 'SEM':
-            clothing_item_codes = DailyData.clothing_item_codes_sem
-            grooming_item_codes = DailyData.grooming_item_codes_sem
-            food_item_codes = DailyData.food_item_codes_sem
-            bedding_item_codes = DailyData.bedding_item_codes_sem
+    # Cleans up the name, birthday and ID of every client at once and stores them in typed columns:
+    #   'first_name', 'last_name', 'dob' and 'client_id'
+    def __normalize_client_identity(self):
+        # SALT exports birthdays as DD-MM-YYYY, but excel reads some of them as MM-DD-YYYY dates
+        dob = self.df['DoB']
+        is_date = dob.map(lambda value: isinstance(value, datetime))
+        text = dob.where(~is_date, pd.to_datetime(dob[is_date]).dt.strftime('%m-%d-%Y'))
+        text = text.where(text.map(lambda value: isinstance(value, str)))
+        text = text.str.strip().str.replace(r'[/.]', '-', regex=True)
+        self.df['dob'] = pd.to_datetime(text, format='%d-%m-%Y', errors='coerce')
+        # update sheet for readability
+        self.df['DoB'] = self.df['dob'].dt.strftime('%m-%d-%Y').where(self.df['dob'].notna(), self.df['DoB'])
+
+        # split name into first and last and strip any trailing whitespaces and nicknames in quotes
+        # an entry like "Edward Powell James" -> "Edward Powell, James" (Last, First)
+        # just remove quotes, as it might be a potential middle name
+        names = self.df['Client Name'].fillna('').astype(str).str.replace('"', '', regex=False).str.strip()
+        split_names = names.str.rsplit(' ', n=1, expand=True)
+        self.df['last_name'] = split_names[0]
+        self.df['first_name'] = split_names[1].fillna('') if 1 in split_names.columns else ''
+
+        # IDs can be read as numbers i.e. 123.0, a missing ID is an empty string
+        ids = self.df['HMIS ID'].astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+        self.df['client_id'] = ids.fillna('').astype(object)
+
+    # Totals up the services and items of every row in the sheet, replaces the item codes with
+    #   the categories that are entered into HMIS
+    # @return: [DataFrame] total of each service to be entered for each row, indexed like the dataframe
+    def __get_service_and_item_totals(self):
+        service_counts = self.item_matcher.count_services(self.df['Service'])
+        item_counts = self.item_matcher.count_items(self.df['Items'])
+
+        # OPTIONAL: collect all unique keys for items i.e. SHO, TOP, etc.
+        if self.list_items:
+            words = self.df['Items'].dropna().astype(str).str.split(" ").explode()
+            self.unique_items.update(words[words.str.isalpha()])
+
+        # order matters - services are entered in the same order as the columns
+        totals = pd.DataFrame(index=self.df.index)
+        totals['Shower'] = service_counts['Shower']
+        # multiply laundry x2 (one wash, one dry)
+        totals['Laundry'] = service_counts['Laundry'] * 2
+        totals['Case Management'] = service_counts['Case Management']
+        totals['Clothing'] = item_counts['Clothing']
+        # add body wash + shampoo for each shower
+        totals['Grooming'] = item_counts['Grooming'] + (service_counts['Shower'] * 2)
+        # add detergent for each laundry run (wash + dry)
+        totals['Laundry Products'] = service_counts['Laundry']
+        totals['Food'] = item_counts['Food']
+        totals['Bedding'] = item_counts['Bedding']
+
+        return totals
+
+    # Turns the totals into the dictionaries of services passed into automation, only keeping the
+    #   services each client actually received
+    # @param: [DataFrame] totals: total of each service, one row per client
+    # @return: [list] dictionary of services for each row of the totals
+    def __get_services_dicts(self, totals):
+        columns = list(totals.columns)
+        return [{column: int(count) for column, count in zip(columns, row) if count > 0}
+                for row in totals.itertuples(index=False)]
 
-        if self.show_output:
-            print("Raw Excel Data:")
-            print("SERVICES")
-            print(row['Service'])
-            print("ITEMS")
-            print(row_items)
-            print()
-            print("Processed Item Counts:")
-
-        if not isinstance(row_items, float):
-            # OPTIONAL: collect all unique keys for items i.e. SHO, TOP, etc.
-            if self.list_items:
-                li = list(row_items.split(" "))
-                for item in li:
-                    if item.isalpha():
-                        self.unique_items.add(item)
-
-            items_string = ""
-
-            # Clothing 
-            clothing_count = 0
-            for item in clothing_item_codes:
-                index = row_items.find(item)
-                if index >= 0:
-                    # find num value attributed to item code
-                    string_list = row_items.split(item)
-                    substring = string_list[1]
-
-                    # get first ':' following item code
-                    i = substring.index(':')
-                    clothing_count += int(substring[i+2])
-            if clothing_count > 0:
-                items_string = (items_string + "Clothing: " + str(clothing_count) + "\n")
-                items_dict['Clothing'] = clothing_count
-            if self.show_output:
-                print("Clothing: " + str(clothing_count))
-
-            # Grooming/Hygiene
-            grooming_count = 0
-            for item in grooming_item_codes:
-                index = row_items.find(item)
-                if index >= 0:
-                    # find num value attributed to item code
-                    string_list = row_items.split(item)
-                    substring = string_list[1]
-
-                    # get first ':' following item code
-                    i = substring.index(':')
-                    grooming_count += int(substring[i+2])
-            # add body wash + shampoo for each shower
-            if 'Shower' in services_dict:
-                grooming_count += (services_dict['Shower'] * 2)
-            if grooming_count > 0:
-                items_string = (items_string + "Grooming: " + str(grooming_count) + "\n")
-                items_dict['Grooming'] = grooming_count
-            if self.show_output:
-                print("Grooming: " + str(grooming_count))
-
-            # Laundry Products
-            laundry_product_count = 0
-            if 'Laundry' in services_dict:
-                # add detergent for each laundry run (wash + dry)
-                laundry_product_count += int(services_dict['Laundry'] / 2)
-            if laundry_product_count > 0:
-                items_string = (items_string + "Laundry Products: " + str(laundry_product_count) + "\n")
-                items_dict['Laundry Products'] = laundry_product_count
-            if self.show_output:
-                print("Laundry Products: " + str(grooming_count))
-
-            # Food 
-            food_count = 0
-            for item in food_item_codes:
-                index = row_items.find(item)
-                if index >= 0:
-                    # find num value attributed to item code
-                    string_list = row_items.split(item)
-                    substring = string_list[1]
-
-                    # get first ':' following item code
-                    i = substring.index(':')
-                    food_count += int(substring[i+2])
-            if food_count > 0:
-                items_string = (items_string + "Food: " + str(food_count) + "\n")
-                items_dict['Food'] = food_count
-            if self.show_output: 
-                print("Food: " + str(food_count))
-
-            # Bedding 
-            bedding_count = 0
-            for item in bedding_item_codes:
-                index = row_items.find(item)
-                if index >= 0:
-                    # find num value attributed to item code
-                    string_list = row_items.split(item)
-                    substring = string_list[1]
-
-                    # get first ':' following item code
-                    i = substring.index(':')
-                    bedding_count += int(substring[i+2])
-            if bedding_count > 0:
-                items_string = (items_string + "Bedding: " + str(bedding_count) + "\n")
-                items_dict['Bedding'] = bedding_count
-            if self.show_output: 
-                print("Bedding: " + str(bedding_count))
-        # if there are no items in the item column but the service column is not empty
-        elif (services_dict): 
-            items_string = ""
-            grooming_count = 0
-            laundry_product_count = 0
-            if 'Shower' in services_dict:
-                grooming_count += (services_dict['Shower'] * 2)
-            if grooming_count > 0:
-                items_string = (items_string + "Grooming: " + str(grooming_count) + "\n")
-                items_dict['Grooming'] = grooming_count
-                if self.show_output:
-                    print("Grooming: " + str(grooming_count))
-            # add detergent for each laundry run (wash + dry)
-            if 'Laundry' in services_dict:
-                laundry_product_count += int(services_dict['Laundry'] / 2)
-            if laundry_product_count > 0:
-                items_string = (items_string + "Laundry Products: " + str(laundry_product_count) + "\n")
-                items_dict['Laundry Products'] = laundry_product_count
-                if self.show_output:
-                    print("Laundry Products: " + str(laundry_product_count))
-
-        return items_dict
-    
     # Make dictionary string more readable
     def __clean_dictionary_string(self, string):
         rep = {"{" : "", "}" : "", ", " : "\n"}
@@ -414,15 +483,41 @@ class DailyData:
         # format: '01 Jan 2024.xlsx'
         self.df.to_excel(self.output_path + output_name + ".xlsx", sheet_name=output_name)
 
+    # Export the list of client visits to be automated as JSON, one client dictionary per visit
+    # @param: [DataFrame] visits: one row per client visit, see '__collapse_duplicate_clients'
+    def __export_work_list(self, visits):
+        date = self.__get_date_from_filename(self.filename)
+        output_name = self.location + "_Work_list_" + str(date.strftime('%m-%d-%Y'))
+
+        work_list = []
+        for visit in visits.itertuples():
+            client_dict = {'Rows': [int(row) for row in visit.rows],
+                           'First Name': visit.first_name,
+                           'Last Name': visit.last_name,
+                           'Client ID': visit.client_id,
+                           'DoB': "" if pd.isna(visit.dob) else visit.dob.strftime('%m-%d-%Y'),
+                           'Services': visit.services}
+            work_list.append(client_dict)
+
+        # format: 'ORL_Work_list_01-31-2024.json'
+        with open(self.output_path + output_name + ".json", 'w') as f:
+            json.dump(work_list, f, indent=4)
+
     # Export a sheet of the failed automated entries in their original format
     # This way we can keep looping the failed entries and try again
     def __export_failed_automation_data(self):
-        # get date from original file and output into new excel sheet
-        date = self.__get_date_from_filename(self.filename)
-        output_name = (self.location + "_Failed_entries_" 
-                       + str(date.strftime('%m')) + '-' 
-                       + str(date.strftime('%d')) + '-' 
-                       + str(date.strftime('%Y')))
+        output_name = self.__get_failed_entries_name()
+
+        # remove clients that were entered successfully from list of failed automated entries
+        self.failed_df = self.failed_df.drop(index=list(self.journal.successful_rows))
 
         # create sheet for remaining clients that need to be entered and could not be automated
-        self.failed_df.to_excel(self.output_path + output_name + ".xlsx", sheet_name = "Failed Entries Report - " + output_name)
\ No newline at end of file
+        self.failed_df.to_excel(self.output_path + output_name + ".xlsx", sheet_name = "Failed Entries Report - " + output_name)
+
+    # Name of the failed entries report for the date of the original file, i.e. 'ORL_Failed_entries_01-31-2024'
+    def __get_failed_entries_name(self):
+        date = self.__get_date_from_filename(self.filename)
+        return (self.location + "_Failed_entries_" 
+                + str(date.strftime('%m')) + '-' 
+                + str(date.strftime('%d')) + '-' 
+                + str(date.strftime('%Y')))
\ No newline at end of file
@@ -1,12 +1,12 @@
 import json
 import salt_driver
+import wait_timeouts
 from datetime import datetime
 '''
 '''
 class DailyReport:
 
     def __init__(self, date, location):
-        self.driver = salt_driver.Driver()
         self.date = date #MM-DD-YYYY
         self.location = location if location else "ORL"
 
@@ -30,8 +30,16 @@ class DailyReport:
             self.password = settings["google_password"]
 
         self.output_path = settings["output_path"]
+        self.timeouts = wait_timeouts.WaitTimeouts(self.output_path + "salt_wait_timeouts.json", salt_driver.Driver.wait_time)
+        self.driver = salt_driver.Driver(self.timeouts)
     
     def download_report(self):
+        try:
+            self.__download_report()
+        finally:
+            self.timeouts.save()
+
+    def __download_report(self):
         self.driver.open_saltwebapp(self.location)
         if not self.use_google_login:
             if not self.driver.login_saltwebapp_native(self.username, self.password):
@@ -1,12 +1,14 @@
-import pandas as pd
 import json
 import hmis_driver
+import spreadsheet_reader
+import entry_journal
+import wait_timeouts
 import os
 
 class DateOfEngagement:
     def __init__(self, filename):
         self.filename = filename
-        self.df = pd.read_excel(io=filename,
+        self.df = spreadsheet_reader.read_spreadsheet(filename,
                              dtype={'clientid': object,
                                     'Name': object,
                                     'ProgramName': object})
@@ -28,12 +30,30 @@ class DateOfEngagement:
         self.username = settings["hmis_username"]
         self.password = settings["hmis_password"]
         self.output_path = settings["output_path"]
+        self.timeouts = wait_timeouts.WaitTimeouts(self.output_path + "hmis_wait_timeouts.json", hmis_driver.Driver.wait_time)
 
     # Clean and prepare data for automation and build client dicts
     def read_and_process_data(self):
         self.__open_clienttrack()
 
+        # keep track of every entry that's been completed, the remaining clients are exported from it at the end
+        self.journal = entry_journal.EntryJournal(self.output_path + "Remaining_DOE_Clients.jsonl",
+                                                  os.path.abspath(self.filename))
+        try:
+            self.__process_rows()
+        finally:
+            # export the remaining clients once, even if the run was interrupted
+            self.__export_failed_automation_data()
+            self.journal.finish()
+            self.timeouts.save()
+            self.driver.close()
+
+    def __process_rows(self):
         for row_index in range(0, len(self.df)):
+            # skip over any clients already completed by an earlier run that didn't finish
+            if row_index in self.journal.successful_rows:
+                continue
+
             client_dict = {}
             row = self.df.iloc[row_index]
 
@@ -48,17 +68,24 @@ class DateOfEngagement:
             # add clientid to dict
             client_dict['Client ID'] = row['clientid']
 
-            self.__delete_date_of_engagement(client_dict, row_index)
+            # log back in and try the client again if the session expires partway through
+            success = self.driver.run_step(self.__delete_date_of_engagement, client_dict)
+            self.journal.record(row_index, success, client_dict['First Name'] + " " + client_dict['Last Name'])
+            if success:
+                remaining = len(self.failed_df.index) - len(self.journal.successful_rows)
+                print("Success! " + str(remaining) + " entries remaining\n")
 
     # Open and login to HMIS Clienttrack
     def __open_clienttrack(self):
-        self.driver = hmis_driver.Driver()
+        self.driver = hmis_driver.Driver(self.timeouts)
         self.driver.open_clienttrack()
         if not self.driver.login_clienttrack(self.username, self.password):
             print("Could not login successfully, closing now")
+            self.driver.close()
             quit()
     
-    def __delete_date_of_engagement(self, client_dict, row_index):
+    # @return: [bool] success / fail
+    def __delete_date_of_engagement(self, client_dict):
         # STEP ONE: SEARCH FOR CLIENT
         print("\nNEW CLIENT: Deleting Date of Engagement for Client " + client_dict['First Name'] + ' ' + client_dict['Last Name'] + ' ' + client_dict['Client ID'])
         if not isinstance(client_dict['Client ID'], float) and client_dict['Client ID'] != "":
@@ -66,29 +93,27 @@ class DateOfEngagement:
         else:
             print("Not enough data provided to search for client:")
             print(client_dict)
-            return
+            return False
 
         if not success:
             print("Client could not be found in the system:")
             print(client_dict)
-            return
+            return False
 
         # STEP TWO: DELETE CLIENT'S DATE OF ENGAGEMENT
         success = self.driver.delete_date_of_engagement() # look at 'update_date_of_engagement'
         if not success:
             print("Date of engagement could not be deleted for client:")
             print(client_dict)
-            return # keep client on failed entry list and move on to next client
-        else:
-            # remove client from list of failed entries
-            self.failed_df = self.failed_df.drop([row_index])
-            print("Success! " + str(len(self.failed_df.index)) + " entries remaining\n")
-            self.__export_failed_automation_data()
+            return False # keep client on failed entry list and move on to next client
+        return True
 
     # Export a sheet of the failed automated entries in their original format
     # This way we can keep looping the failed entries and try again
     def __export_failed_automation_data(self):
         # get date from original file and output into new excel sheet
         output_name = ("Remaining_DOE_Clients.xlsx")
+        # remove clients that were updated successfully from list of failed entries
+        self.failed_df = self.failed_df.drop(index=list(self.journal.successful_rows))
         # create sheet for remaining clients that need to be entered and could not be automated
         self.failed_df.to_excel(self.output_path + output_name, sheet_name = "Failed Entries Report - " + output_name)
\ No newline at end of file
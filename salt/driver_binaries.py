@@ -0,0 +1,81 @@
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.firefox import GeckoDriverManager
+from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+from datetime import datetime
+import tempfile
+import json
+import os
+
+'''
+Finds the chromedriver and geckodriver binaries the drivers are started with. webdriver_manager
+looks up the latest driver online every time it's asked, which adds seconds to every start up and
+fails without a network. Instead, each driver is downloaded once and pinned to the major version
+of the browser it was downloaded for, and later start ups only check the installed browser's
+version on this machine. A new driver is only downloaded once the browser has been updated, and
+if that download fails the pinned driver is used anyway.
+'''
+# pinned drivers are kept next to webdriver_manager's own cache of the downloaded binaries
+cache_filename = os.path.join(os.path.expanduser("~"), ".wdm", "pinned_drivers.json")
+
+# @return: [str] path of a chromedriver that matches the installed Chrome
+def chromedriver_path():
+    return _resolve('chromedriver', _browser_version(ChromeType.GOOGLE, ChromeType.CHROMIUM),
+                    lambda: ChromeDriverManager().install())
+
+# @return: [str] path of a geckodriver for the installed Firefox
+def geckodriver_path():
+    return _resolve('geckodriver', _browser_version('firefox'), lambda: GeckoDriverManager().install())
+
+# Returns the pinned driver if it still matches the browser, otherwise downloads and pins a new one
+# @param: [str] name: name of the driver i.e. chromedriver
+#         [str] browser_version: major version of the installed browser, None if it couldn't be found
+#         [function] install: downloads the driver and returns its path
+# @return: [str] path of the driver
+def _resolve(name, browser_version, install):
+    pinned = _load().get(name)
+    if pinned and os.path.exists(pinned['path']):
+        # if the browser's version can't be found, the pinned driver is the best guess there is
+        if browser_version is None or pinned['browser_version'] == browser_version:
+            return pinned['path']
+        print("Browser has been updated to version " + browser_version + ", getting a new " + name)
+
+    try:
+        path = install()
+    except Exception as e:
+        if pinned and os.path.exists(pinned['path']):
+            print("Couldn't get a new " + name + ", using the one for version " + str(pinned['browser_version']))
+            return pinned['path']
+        raise
+
+    _save(name, {'browser_version': browser_version, 'path': path,
+                 'pinned_at': datetime.now().isoformat(timespec='seconds')})
+    return path
+
+# Reads the version of the installed browser on this machine, without going online
+# @param: [list] browser_types: browsers to check in order, i.e. Chrome then Chromium
+# @return: [str] major version of the first browser found, None if none of them were found
+def _browser_version(*browser_types):
+    for browser_type in browser_types:
+        try:
+            version = OperationSystemManager().get_browser_version_from_os(browser_type)
+        except Exception as e:
+            version = None
+        if version:
+            return version.split(".")[0]
+    return None
+
+def _load():
+    try:
+        with open(cache_filename) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# Writes to a temporary file first, so another run starting at the same time never reads half a file
+def _save(name, entry):
+    pinned = _load()
+    pinned[name] = entry
+    os.makedirs(os.path.dirname(cache_filename), exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(cache_filename), suffix=".json", delete=False) as f:
+        json.dump(pinned, f, indent=4)
+    os.replace(f.name, cache_filename)
@@ -0,0 +1,73 @@
+from datetime import datetime
+import json
+import os
+
+'''
+Append-only record of the outcome of every row that goes through automation. Each outcome is
+flushed to disk as soon as it's known, so the failed entries report only has to be written
+once at the end of a run instead of after every client. If a run crashes before it finishes,
+the next run on the same file picks up the outcomes that were already recorded.
+'''
+class EntryJournal:
+    def __init__(self, filename, source):
+        self.filename = filename
+        self.source = source
+        self.successful_rows = set()
+
+        if self.__recover():
+            print("Resuming unfinished run, " + str(len(self.successful_rows)) + " entries already completed")
+            self.file = open(self.filename, 'a')
+            # the last line can be cut off if the process was killed mid-write
+            if self.file.tell() > 0 and not self.__ends_with_newline():
+                self.file.write("\n")
+        else:
+            self.file = open(self.filename, 'w')
+            self.__write({'event': 'start', 'source': self.source})
+
+    # Records the outcome of a single row
+    # @param: [int] row_index: index of the row in the original report
+    #         [bool] success: whether the row was entered successfully
+    #         [str] client_name: name of the client, makes the journal easier to read
+    def record(self, row_index, success, client_name=""):
+        if success:
+            self.successful_rows.add(int(row_index))
+        self.__write({'event': 'entry', 'row': int(row_index), 'success': success, 'client': client_name})
+
+    # Marks the run as finished so the next run starts a new journal
+    def finish(self):
+        self.__write({'event': 'finish'})
+        self.file.close()
+
+    def __write(self, entry):
+        entry['time'] = datetime.now().isoformat(timespec='seconds')
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def __ends_with_newline(self):
+        with open(self.filename, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    # Reads the journal left behind by a previous run on the same file that never finished
+    # @return: [bool] true if there was a run to resume
+    def __recover(self):
+        if not os.path.exists(self.filename):
+            return False
+
+        successful_rows = set()
+        with open(self.filename) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry['event'] == 'start' and entry['source'] != self.source:
+                    return False
+                if entry['event'] == 'finish':
+                    return False
+                if entry['event'] == 'entry' and entry['success']:
+                    successful_rows.add(entry['row'])
+
+        self.successful_rows = successful_rows
+        return True
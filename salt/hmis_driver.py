@@ -3,12 +3,14 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
-import difflib
+from selenium.common.exceptions import TimeoutException
+import wait_timeouts
+import name_matcher
+import driver_binaries
+import re
 import time
 import traceback
 
@@ -27,32 +29,131 @@ class Driver:
     iframe_dialog_counter = 1
 
     # Global Variables
-    wait_time = 3
+    wait_time = 3 # starting timeout of every wait, see 'wait_timeouts.py'
+    # the 'Add Service' form drops values that are typed in right after a service is picked,
+    #   even once the page says it's done loading
+    form_delay = 0.5
+    # logging in can take much longer than loading a page
+    login_wait_time = 20
+    # when the session expires, wait at least this many seconds between logins and give up after so many of them
+    relogin_interval = 30
+    max_relogins = 5
+    # start the browser without images, web fonts or anything else the automation never reads,
+    #   see '__lean_options'
+    lean_browser = True
+    # web fonts are blocked by their URL, Chrome has no setting for them
+    blocked_urls = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+    disk_cache_size = 50 * 1024 * 1024 # bytes
 
     '''
     ------------------------ SETUP ------------------------
     '''
 
-    def __init__(self):
+    # @param: [WaitTimeouts] timeouts: timeouts learned from earlier runs, shared between sessions
+    #         [bool] lean: start the browser with the lean profile, defaults to 'lean_browser'
+    def __init__(self, timeouts=None, lean=None):
+        self.timeouts = timeouts if timeouts else wait_timeouts.WaitTimeouts(default=self.wait_time)
+
+        # what the browser is currently showing, so navigation that's already done can be skipped
+        # see '__switch_to_iframe' and '__on_page'
+        self.workspace = None # workspace open in the left sidebar i.e. 'Clients'
+        self.frame = None # id of the iframe in focus, None for the main page
+        self.page = None # page loaded in the iframe, only set once it's been checked
+        # (HMIS ID, dashboard first name, dashboard last name, confidence) of the client found by the last search,
+        #   see 'client_cache.py'
+        self.client = None
+        # (option value, name) of the SALT enrollment services were last entered under, see 'enter_client_services'
+        self.enrollment = None
+        self.enrollment_rejected = False # set when the enrollment given to 'enter_client_services' couldn't be picked
+
+        # stored so the session can log back in by itself when it expires, see 'run_step'
+        self.credentials = None
+        self.logged_out = False # set when a wait fails because the session has expired
+        self.last_login = 0
+        self.relogins = 0
+
         chrome_options = Options()
         chrome_options.add_experimental_option("detach", True)
 
         # added for linux build
         chrome_options.add_argument("--headless")
 
-        self.browser = Chrome(options=chrome_options, service=ChromeService(ChromeDriverManager().install()))
+        self.lean = self.lean_browser if lean is None else lean
+        if self.lean:
+            self.__lean_options(chrome_options)
+
+        self.browser = Chrome(options=chrome_options, service=ChromeService(driver_binaries.chromedriver_path()))
+        if self.lean:
+            self.browser.execute_cdp_cmd('Network.enable', {})
+            self.browser.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+
+    # Leaves out everything Clienttrack doesn't need to be automated: images, web fonts, extensions,
+    #   the GPU and Chrome's own background requests. Pages are handed back as soon as they're parsed
+    #   instead of once every image has loaded, every step already waits for what it needs
+    # @param: [Options] chrome_options: options the browser is started with
+    def __lean_options(self, chrome_options):
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disk-cache-size=" + str(self.disk_cache_size))
+
+    # Closes the browser, it's kept open after the script ends otherwise
+    def close(self):
+        try:
+            self.browser.quit()
+        except Exception as e:
+            pass
 
     def open_clienttrack(self):
         self.browser.get('https://clienttrack.eccovia.com/login/HSNCFL')
 
+    # Logs in and checks that it worked by waiting for the sidebar of the main page
+    # @return: [bool] success / fail
     def login_clienttrack(self, username, password):
+        button_nav_clients_page_id = "ws_2_tab"
+
+        self.credentials = (username, password)
+        self.last_login = time.time()
         field_username = self.browser.find_element(By.ID, "UserName")
         field_password = self.browser.find_element(By.ID, "Password")
 
         field_username.send_keys(username)
         field_password.send_keys(password)
         field_password.send_keys(Keys.RETURN)
+
+        try:
+            self.__wait('Login', EC.presence_of_element_located((By.ID, button_nav_clients_page_id)),
+                        min_timeout=self.login_wait_time)
+        except Exception as e:
+            print("Couldn't log into HMIS Clienttrack as " + username)
+            return False
+        self.logged_out = False
         return True
+
+    # Runs a step of the workflow, and if the session expired partway through it, logs back in and
+    #   runs the whole step once more
+    # @param: [function] step: step to be run i.e. entering a single client
+    # @return: the result of the step
+    def run_step(self, step, *args, **kwargs):
+        self.logged_out = False
+        try:
+            result = step(*args, **kwargs)
+        except Exception as e:
+            if not self.logged_out:
+                raise
+            result = False
+
+        if self.logged_out and self.__log_back_in():
+            print("Trying the current client again")
+            result = step(*args, **kwargs)
+        return result
     
     '''
     ------------------------ WORKFLOW ------------------------
@@ -61,18 +162,20 @@ class Driver:
     # @param: [str] id: ID of the client being searched
     #         [str] first_name: first name to be checked
     #         [str] last_name: last name to be checked
+    #         [tuple] verified_name: (first name, last name) on the dashboard the last time this name was
+    #                                checked against this ID, the name isn't scored again if it's the same
     # @return: [bool] success / fail
-    def search_client_by_ID(self, id, first_name, last_name):
+    def search_client_by_ID(self, id, first_name, last_name, verified_name=None):
+        self.client = None
         self.navigate_to_find_client()
 
         field_client_id_id = "1000005942_Renderer"
         button_search_id = "Renderer_SEARCH"
-        label_client_name_xpath = '//td[@class="Header ZoneTopRow_2"]//a'
 
         # enter id into client id field
         self.__switch_to_iframe(self.iframe_id)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Find Client: Client ID',
                 EC.element_to_be_clickable((By.ID, field_client_id_id))
             )
             field_client_id = self.browser.find_element(By.ID, field_client_id_id)        
@@ -91,34 +194,25 @@ class Driver:
         self.__switch_to_iframe(self.iframe_id) # wait for new iframe to load
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
-                EC.presence_of_element_located((By.XPATH, label_client_name_xpath))
-            )
-            dashboard_title = self.browser.find_element(By.XPATH, label_client_name_xpath).get_attribute("title")
-            dashboard_name = dashboard_title.split("'s")[0]
-            dashboard_first_name = dashboard_name.split(" ", 1)[0]
-            dashboard_last_name = dashboard_name.split(" ", 1)[1]
+            dashboard_first_name, dashboard_last_name = self.__read_dashboard_name()
 
             # calculate similarity score of the name on the dashboard and our clients name
-            min_score = 0.80
-            first_name_score = self.__similar(dashboard_first_name, first_name)
-            last_name_score = self.__similar(dashboard_last_name, last_name) 
-            final_score_one = first_name_score + last_name_score
-            if final_score_one >= min_score:
-                return True
-
-            # sometimes first and last names are swapped, check both scenarios
-            first_name_score = self.__similar(dashboard_first_name, last_name)
-            last_name_score = self.__similar(dashboard_last_name, first_name) 
-            final_score_two = first_name_score + last_name_score
-            if final_score_two >= min_score:
-                return True
+            # sometimes first and last names are swapped, both are checked
+            client_name = name_matcher.NameMatcher(first_name, last_name)
+            if verified_name == (dashboard_first_name, dashboard_last_name):
+                confidence = 1.0
+            elif client_name.matches(dashboard_first_name, dashboard_last_name):
+                confidence = client_name.score(dashboard_first_name, dashboard_last_name) / 2
+            else:
+                print("Client Name is not a match")
+                print("Similarity Score:", client_name.score(dashboard_first_name, dashboard_last_name))
+                print("Current Client: " + first_name, last_name)
+                print("Loaded Client: " + dashboard_first_name, dashboard_last_name)
+                return False
 
-            print("Client Name is not a match")
-            print("Similarity Score:", max(final_score_one, final_score_two))
-            print("Current Client: " + first_name, last_name)
-            print("Loaded Client: " + dashboard_first_name, dashboard_last_name)
-            return False
+            self.__set_page('Client Dashboard')
+            self.client = (str(id), dashboard_first_name, dashboard_last_name, confidence)
+            return True
         except Exception as e:
             print("Couldn't find correct Client Name")
             return False
@@ -130,6 +224,7 @@ class Driver:
     #         [str] last_name: last name to be checked
     # @return: [bool] success / fail
     def search_client_by_birthdate(self, birthdate, first_name, last_name):
+        self.client = None
         self.navigate_to_find_client()
 
         field_birthdate_id = "1000005939_Renderer"
@@ -138,7 +233,7 @@ class Driver:
 
         self.__switch_to_iframe(self.iframe_id)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Find Client: Birth Date',
                 EC.element_to_be_clickable((By.ID, field_birthdate_id))
             )
             # enter birthday to field
@@ -154,86 +249,28 @@ class Driver:
             return False
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Find Client: Results',
                 EC.visibility_of_all_elements_located((By.XPATH, table_search_results_rows_xpath))
             )
-            # search through rows in tables for best match
-            result_max_score = 0
-            table_search_results = self.browser.find_elements(By.XPATH, table_search_results_rows_xpath)
-            for result in table_search_results:
-                result_first_name = result.find_element(By.XPATH, "td[2]").text
-                result_last_name = result.find_element(By.XPATH, "td[3]").text
-
-                # calculate the similarity score of the current result in list
-                first_name_score = self.__similar(result_first_name, first_name)
-                last_name_score = self.__similar(result_last_name, last_name) 
-                final_score = first_name_score + last_name_score
-                min_score = 1.4
-
-                # if a decent match, store the value and compare with other viable matches
-                if final_score >= min_score:
-                    if first_name_score + last_name_score > result_max_score:
-                        # update new max value
-                        result_max_score = first_name_score + last_name_score
-                        stored_result = result
-
-                # sometimes the first and last names are flipped
-                first_name_score = self.__similar(result_first_name, last_name)
-                last_name_score = self.__similar(result_last_name, first_name)
-                final_score = first_name_score + last_name_score
-                if final_score >= min_score:
-                    if first_name_score + last_name_score > result_max_score:
-                        # update new max value
-                        result_max_score = first_name_score + last_name_score
-                        stored_result = result
-            # For Loop End
-                
-            if result_max_score > 0:
-                stored_result.click()
-                return True
-
-            # if there still isn't a decent match, check middle name field and different combinations
-            print("Checking Middle Name")
-            last_names = last_name.split(" ", 1) 
-            names = last_names + [first_name]
-
-            for result in table_search_results:
-                result_first_name = result.find_element(By.XPATH, "td[2]").text
-                result_last_name = result.find_element(By.XPATH, "td[3]").text
-                result_mid_name = result.find_element(By.XPATH, "td[4]").text
-                # if client has two names i.e. James Yates
-                if len(names) <= 2:
-                    min_score = 1.4
-                    mid_name_score = max(self.__similar(first_name, result_mid_name),
-                                          self.__similar(last_name, result_mid_name))
-                    first_name_score = max(self.__similar(first_name, result_first_name),
-                                           self.__similar(last_name, result_first_name))
-                    last_name_score = max(self.__similar(first_name, result_last_name),
-                                          self.__similar(last_name, result_last_name))
-                    final_score = max((first_name_score + mid_name_score), (last_name_score + mid_name_score))
-                    if final_score >= min_score and final_score > result_max_score:
-                        result_max_score = final_score
-                        stored_result = result
-                # if client name has three names i.e. James Baxton Yates, check every combo
-                else:
-                    min_score = 2 # 3 is a perfect match (first, middle, last)
-                    # check every combination of names to middle names
-                    for name in names:
-                        remaining_names = names.copy()
-                        remaining_names.remove(name)
-
-                        first_name_score = self.__similar(result_first_name, name)
-                        for i in range(2):
-                            mid_name_score = self.__similar(result_mid_name, remaining_names[i%2])
-                            last_name_score = self.__similar(result_last_name, remaining_names[(i+1)%2])
-                            final_score = first_name_score + mid_name_score + last_name_score
-                            if final_score >= min_score and final_score > result_max_score:
-                                result_max_score = final_score
-                                stored_result = result
-            # For Loop End
-
-            if result_max_score > 0:
-                stored_result.click()
+            # search through rows in tables for best match, checking the middle names if there
+            #   isn't a decent match on first and last name
+            table_search_results = self.__read_table(table_search_results_rows_xpath)
+            client_name = name_matcher.NameMatcher(first_name, last_name)
+            best_result = client_name.best_result([(result['cells'][1], result['cells'][2], result['cells'][3])
+                                                   for result in table_search_results])
+            if best_result is not None:
+                table_search_results[best_result]['row'].click()
+                # wait for the client's dashboard, so services can be entered without loading it again
+                try:
+                    dashboard_first_name, dashboard_last_name = self.__read_dashboard_name()
+                    self.__set_page('Client Dashboard')
+                    # the first column of the results is the client's ID
+                    client_id = table_search_results[best_result]['cells'][0]
+                    if client_id.isdigit():
+                        self.client = (client_id, dashboard_first_name, dashboard_last_name,
+                                       client_name.score(dashboard_first_name, dashboard_last_name) / 2)
+                except Exception as e:
+                    pass
                 return True
 
             print("Couldn't find client name among results")
@@ -248,8 +285,20 @@ class Driver:
     #                                        most to least favorable
     #         [str] service_date: date of service
     #         [dict] services_dict: dictionary of services to be entered
+    #         [str] enrollment: option value of the enrollment the client's services were entered under before,
+    #                           it's picked straight away instead of looking through every enrollment
+    #         [function] on_service_saved: called as on_service_saved(service, units) as soon as each service is saved
+    #         [dict] all_services: every service the client got on the date of service, when 'services_dict' is only
+    #                              part of them i.e. the increase since the report was last run
     # @return: [bool] success / fail
-    def enter_client_services(self, viable_enrollment_list, service_date, services_dict, location):
+    def enter_client_services(self, viable_enrollment_list, service_date, services_dict, location, enrollment=None,
+                              on_service_saved=None, all_services=None):
+        self.enrollment = None
+        # kept through the call made after enrolling the client, which isn't given an enrollment
+        if enrollment:
+            self.enrollment_rejected = False
+        # services saved by this call, so they aren't entered twice if the client has to be enrolled partway through
+        saved_services = set()
         button_add_new_service_id = "Renderer_1000000216"
         dropdown_enrollment_id = "1000007089_Renderer"
         dropdown_service_id = "1000007094_Renderer"
@@ -284,6 +333,15 @@ class Driver:
         self.navigate_to_client_dashboard()
         self.navigate_to_service_list()
 
+        # skip the services that are already in HMIS, i.e. the client was entered by an earlier run
+        all_services = all_services if all_services else services_dict
+        entered = self.__read_entered_services(viable_enrollment_list, service_date, all_services)
+        missing_services = self.__get_missing_services(services_dict, all_services, entered)
+        if services_dict and not missing_services:
+            print("Every service is already in HMIS")
+            return True
+        services_dict = missing_services
+
         # start entering services
         for service, service_count in services_dict.items():
             # wait until 'Services' page is fully loaded and 'Add Service Button' is clickable
@@ -291,7 +349,7 @@ class Driver:
             self.__wait_until_page_fully_loaded('Service')
             self.__wait_until_result_set_fully_loaded()
             try:
-                WebDriverWait(self.browser, self.wait_time).until(
+                self.__wait('Service: Add Service',
                     EC.element_to_be_clickable((By.ID, button_add_new_service_id))
                 )
                 button_add_new_service = self.browser.find_element(By.ID, button_add_new_service_id)
@@ -306,20 +364,29 @@ class Driver:
 
             # find viable 'enrollment' option in the drop down list
             try:
-                WebDriverWait(self.browser, self.wait_time).until(
+                self.__wait('Add Service: Enrollment',
                     EC.element_to_be_clickable((By.ID, dropdown_enrollment_id))
                 )
-                dropdown_enrollment = self.browser.find_element(By.ID, dropdown_enrollment_id)
-                dropdown_options = dropdown_enrollment.find_elements(By.TAG_NAME, 'option')
-
                 enrollment_found = False
-                for salt_enrollment in viable_enrollment_list:
+                # the enrollment of an earlier service or an earlier night is picked by its value
+                if enrollment:
+                    enrollment_found = self.__select_enrollment(dropdown_enrollment_id, enrollment, viable_enrollment_list)
                     if not enrollment_found:
-                        for option in dropdown_options:
-                            if salt_enrollment in option.text:
-                                option.click()
-                                enrollment_found = True
-                                break
+                        print("Couldn't pick the client's usual enrollment, looking through every enrollment")
+                        self.enrollment_rejected = True
+                        enrollment = None
+
+                if not enrollment_found:
+                    # read every option at once, then pick the most desirable one by value
+                    dropdown_enrollment = self.browser.find_element(By.ID, dropdown_enrollment_id)
+                    dropdown_options = self.browser.execute_script(
+                        "return Array.from(arguments[0].options, option => [option.value, option.text]);", dropdown_enrollment)
+                    for salt_enrollment in viable_enrollment_list:
+                        option_value = next((value for value, text in dropdown_options if salt_enrollment in text), None)
+                        if option_value is not None:
+                            enrollment_found = self.__select_enrollment(dropdown_enrollment_id, option_value, viable_enrollment_list)
+                            enrollment = option_value if enrollment_found else None
+                            break
                 # enroll the client and try again, enrollment should be found in recursive call
                 if not enrollment_found:
                     '''
@@ -336,37 +403,53 @@ class Driver:
                         return False
 
                     print("Successfully enrolled client -- Entering services")
-                    return self.enter_client_services(viable_enrollment_list, service_date, services_dict, location)
+                    remaining_services = {service: service_count for service, service_count in services_dict.items()
+                                          if service not in saved_services}
+                    return self.enter_client_services(viable_enrollment_list, service_date, remaining_services, location,
+                                                      on_service_saved=on_service_saved, all_services=all_services)
             except Exception as e:
                 print("Error finding enrollment")
                 print(traceback.format_exc())
                 return False
 
             try:
-                # enter corresponding service - added sleep, as filling the form too fast causes it to be incorrect
+                # enter corresponding service - picking a service reloads the rest of the form, so
+                #   wait for it to finish before filling in anything else
                 service_code = options_service_values[service]
                 dropdown_option_xpath = '//select[@id="%s"]//option[@value="%s"]' %(dropdown_service_id, service_code)
                 option_service = self.browser.find_element(By.XPATH, dropdown_option_xpath)
                 option_service.click()
-                time.sleep(1)
+                self.__wait('Add Service: Service', EC.element_to_be_selected(option_service))
+                self.__wait_until_postback_finished()
+                time.sleep(self.form_delay)
             
                 # enter unit value
                 field_units = self.browser.find_element(By.ID, field_units_id)
                 field_units.clear()
-                time.sleep(1)
+                self.__wait_until_value_committed(field_units, "")
                 field_units.send_keys(service_count)
-                time.sleep(1)
+                if not self.__wait_until_value_committed(field_units, service_count):
+                    raise Exception("Units weren't entered")
 
                 # enter date
                 field_date = self.browser.find_element(By.ID, field_date_id)
                 field_date.clear()
                 field_date.send_keys(service_date)
-                time.sleep(1)
+                if not self.__wait_until_value_committed(field_date, service_date):
+                    raise Exception("Date wasn't entered")
 
-                # click save button
+                # click save button, the form closes once the service is saved
                 button_save = self.browser.find_element(By.ID, button_save_id)
                 button_save.click()
-                time.sleep(2)
+                if (not self.__wait_until_reloaded(button_save)
+                    and not self.__service_saved(viable_enrollment_list, service_date, all_services, service,
+                                                 service_count, entered)):
+                    raise Exception("Service wasn't saved")
+                if entered is not None:
+                    entered[service] = entered.get(service, 0) + service_count
+                saved_services.add(service)
+                if on_service_saved:
+                    on_service_saved(service, service_count)
             except Exception as e:
                 print("Couldn't enter " + service + " service for client")
                 print(traceback.format_exc())
@@ -399,7 +482,7 @@ class Driver:
         self.__switch_to_iframe(self.iframe_id)
         self.__wait_until_page_fully_loaded('Enrollments')
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Enrollments: New Enrollment',
                 EC.element_to_be_clickable((By.ID, button_new_enrollment_id))
             )
             button_new_enrollment = self.browser.find_element(By.ID, button_new_enrollment_id)
@@ -415,18 +498,12 @@ class Driver:
         # sometimes the 'Veteran Status' field hasn't been updated as its a new required field
         # check that the dropdown isn't on "--SELECT--" option before hitting submit
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
-                EC.element_to_be_clickable((By.ID, dropdown_veteran_status_id))
+            self.__wait('Intake - Basic Client Info: Veteran Status',
+                EC.element_to_be_clickable((By.ID, dropdown_veteran_status_id)), optional=True
             )
-            dropdown_veteran_status = Select(self.browser.find_element(By.ID, dropdown_veteran_status_id))
-            selected_option = dropdown_veteran_status.first_selected_option
-
-            if "SELECT" in selected_option.text:
-                option_data_not_collected_xpath = ('//select[@id="%s"]//option[@value="%s"]' 
-                                                   %(dropdown_veteran_status_id, option_data_not_collected_value))
-                option_data_not_collected = self.browser.find_element(By.XPATH, option_data_not_collected_xpath)
-                option_data_not_collected.click()
-            time.sleep(1)
+            self.__fill_form('Intake - Basic Client Info', [
+                (dropdown_veteran_status_id, option_data_not_collected_value, True),
+            ])
         except Exception as e:
             print("Couldn't update Veteran Status, field not selected (sometimes doesn't exist)")
             # print(traceback.format_exc())
@@ -434,14 +511,14 @@ class Driver:
 
         button_finish = self.browser.find_element(By.ID, button_finish_id)
         button_finish.click()
-        time.sleep(2)
+        self.__wait_until_reloaded(button_finish)
 
         # wait until 'Family Members' section loads
         self.__switch_to_iframe(self.iframe_id)
         self.__wait_until_page_fully_loaded('Intake - Family Members')
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Intake - Family Members: Save and Close',
                 EC.element_to_be_clickable((By.ID, button_save_and_close_id))
             )
             button_save_and_close = self.browser.find_element(By.ID, button_save_and_close_id)
@@ -456,13 +533,12 @@ class Driver:
         self.__wait_until_page_fully_loaded('Intake - Program Enrollment')
         
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Intake - Program Enrollment: Project',
                 EC.element_to_be_clickable((By.ID, dropdown_project_id))
             )
-            dropdown_option_xpath = '//select[@id="%s"]//option[@value="%s"]' %(dropdown_project_id, option_salt_enrollment_value)
-            option_salt_orl = self.browser.find_element(By.XPATH, dropdown_option_xpath)
-            option_salt_orl.click()
-            time.sleep(1)
+            # picking the project reloads the household table below it, so it's filled in on its own
+            if self.__fill_form('Intake - Program Enrollment', [(dropdown_project_id, option_salt_enrollment_value, False)]):
+                raise Exception("SALT enrollment couldn't be selected")
         except Exception as e:
             print("Couldn't find SALT ORL Enrollment in options")
             print(traceback.format_exc())
@@ -470,53 +546,45 @@ class Driver:
 
         # update household data for program enrollment and only enroll current client (not family members)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Intake - Program Enrollment: Household',
                 EC.presence_of_element_located((By.XPATH, dropdown_rel_to_head_of_household_xpath))
             )
             # if the household has multiple members, look for the current client to enroll
-            rows_family_members = self.browser.find_elements(By.XPATH, table_row_family_members_xpath)
+            rows_family_members = self.__read_table(table_row_family_members_xpath)
 
             if len(rows_family_members) < 2:
                 field_project_date = self.browser.find_elements(By.XPATH, field_project_date_xpath)[2]
                 field_date_of_engagement = self.browser.find_elements(By.XPATH, field_date_of_engagement_xpath)[4]
             else:
-                self.browser.switch_to.default_content()
+                self.__switch_to_default_content()
                 label_client_name_xpath = '//span[@aria-label="Name"]'
                 str = self.browser.find_element(By.XPATH, label_client_name_xpath).text
                 client_name = str.split(' ')[1] + ", " + str.split(' ')[0]
                 self.__switch_to_iframe(self.iframe_id)
 
-                stored_row = rows_family_members[0]
+                client_row = 0
                 max_score = 0
-                for row in rows_family_members:
-                    row_name = row.find_element(By.XPATH, "./th").text
-                    score = self.__similar(row_name, client_name)
+                for i, row in enumerate(rows_family_members):
+                    score = self.__similar(row['header'], client_name)
                     if score > max_score:
-                        stored_row = row
+                        client_row = i
                         max_score = score
 
-                option_self = stored_row.find_element(By.XPATH, './/select//option[@value="SL"]')
-                time.sleep(1)
-                self.browser.execute_script("arguments[0].scrollIntoView({block: 'end'});", stored_row.find_element(By.XPATH,'.//select'))
-                time.sleep(1)
-                option_self.click()
-
+                # relationship to head of household is 'Self', picking it posts the form back and
+                #   redraws the household table, so the client's row has to be found again afterwards
+                dropdown_rel_to_head_of_household = rows_family_members[client_row]['row'].find_element(By.XPATH, './/select')
+                # by id when it has one, so it can still be read back once the table is redrawn
+                dropdown_rel_to_head_of_household = (dropdown_rel_to_head_of_household.get_attribute("id")
+                                                     or dropdown_rel_to_head_of_household)
+                if self.__fill_form('Intake - Program Enrollment', [(dropdown_rel_to_head_of_household, 'SL', False)]):
+                    raise Exception("Relationship to head of household couldn't be filled in")
+                stored_row = self.browser.find_elements(By.XPATH, table_row_family_members_xpath)[client_row]
                 field_project_date = stored_row.find_elements(By.XPATH, './td/span[@class="DateField input-group"]/input')[2]
                 field_date_of_engagement = stored_row.find_elements(By.XPATH, './td/span[@class="DateField input-group"]/input')[4]
 
-            time.sleep(2)
-            self.browser.execute_script("arguments[0].scrollIntoView({block: 'center'});", field_project_date)
-            time.sleep(2)
-            WebDriverWait(self.browser, self.wait_time).until(EC.element_to_be_clickable(field_project_date))
-            field_project_date.click()
-            time.sleep(1)
-            field_project_date.clear()
-            time.sleep(3)
-            self.browser.execute_script("arguments[0].scrollIntoView();", field_project_date)
-            time.sleep(1)
-            field_project_date.send_keys(service_date)
-            time.sleep(1)
-
+            # only enroll the current client, with the date of service as the project start date
+            if self.__fill_form('Intake - Program Enrollment', [(field_project_date, self.__format_date(service_date), False)]):
+                raise Exception("Project start date couldn't be filled in")
 
             '''
             # No longer updating date of engagement
@@ -533,7 +601,7 @@ class Driver:
 
             button_save = self.browser.find_element(By.ID, button_save_id)
             button_save.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Couldn't update household")
             print(traceback.format_exc())
@@ -559,62 +627,32 @@ class Driver:
 
         # INITIAL ASSESSMENT
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Universal Data Assessment: Dates',
                 EC.visibility_of_any_elements_located((By.XPATH, date_fields_xpath))
             )
 
-            # Client Information
+            # Client Information, Enrollment CoC and Living Situation
+            # (field id, value, only fill in if empty)
+            option_county_id = option_orange_county_id if location == 'ORL' else option_sem_county_id
             field_assessment_date_id = '1000006788_Renderer'
-            field_assessment_date = self.browser.find_element(By.ID, field_assessment_date_id)
-            field_assessment_date.click()
-            field_assessment_date.clear()
-            field_assessment_date.send_keys(service_date)
-
             dropdown_disabling_condition_id = '1000006806_Renderer'
-            dropdown_disabling_condition = self.browser.find_element(By.ID, dropdown_disabling_condition_id)
-            if self.__dropdown_empty(dropdown_disabling_condition):
-                self.__select_assessment_dropdown_option(dropdown_disabling_condition, option_no_id)
-
-            # Enrollment CoC
             dropdown_county_id = '1000006849_Renderer'
-            dropdown_county = self.browser.find_element(By.ID, dropdown_county_id)
-            if self.__dropdown_empty(dropdown_county):
-                option_county_id = option_orange_county_id if location == 'ORL' else option_sem_county_id
-                self.__select_assessment_dropdown_option(dropdown_county, option_county_id)
-
-            # Living Situation
             dropdown_prior_living_sit_id = '1000006811_Renderer'
-            dropdown_prior_living_sit = self.browser.find_element(By.ID, dropdown_prior_living_sit_id)
-            if self.__dropdown_empty(dropdown_prior_living_sit):
-                self.__select_assessment_dropdown_option(dropdown_prior_living_sit, option_place_not_meant_for_habitation_id)
-
             dropdown_length_of_stay_id = '1000006812_Renderer'
-            dropdown_length_of_stay = self.browser.find_element(By.ID, dropdown_length_of_stay_id)
-            if self.__dropdown_empty(dropdown_length_of_stay):
-                self.__select_assessment_dropdown_option(dropdown_length_of_stay, option_data_not_collected_id)
-
             field_homeless_start_date_id = '1000006795_Renderer'
-            field_homeless_start_date = self.browser.find_element(By.ID,field_homeless_start_date_id)
-            field_value = field_assessment_date.get_property("value")
-            str = field_value.replace("/", "")
-            # if its the date of service, it means the field is empty
-            if service_date in str:
-                field_homeless_start_date.click()
-                time.sleep(1)
-                field_homeless_start_date.clear()
-                time.sleep(1)
-                field_homeless_start_date.send_keys(service_date)
-                time.sleep(1)
-            
             dropdown_street_frequency_id = '1000006807_Renderer'
-            dropdown_street_frequency = self.browser.find_element(By.ID, dropdown_street_frequency_id)
-            if self.__dropdown_empty(dropdown_street_frequency):
-                self.__select_assessment_dropdown_option(dropdown_street_frequency, option_data_not_collected_id)
-
             dropdown_months_homeless_id = '1000006813_Renderer'
-            dropdown_months_homeless = self.browser.find_element(By.ID, dropdown_months_homeless_id)
-            if self.__dropdown_empty(dropdown_months_homeless):
-                self.__select_assessment_dropdown_option(dropdown_months_homeless, option_data_not_collected_id)
+            if self.__fill_form('Universal Data Assessment', [
+                (field_assessment_date_id, self.__format_date(service_date), False),
+                (dropdown_disabling_condition_id, option_no_id, True),
+                (dropdown_county_id, option_county_id, True),
+                (dropdown_prior_living_sit_id, option_place_not_meant_for_habitation_id, True),
+                (dropdown_length_of_stay_id, option_data_not_collected_id, True),
+                (field_homeless_start_date_id, self.__format_date(service_date), False),
+                (dropdown_street_frequency_id, option_data_not_collected_id, True),
+                (dropdown_months_homeless_id, option_data_not_collected_id, True),
+            ]):
+                raise Exception("Universal Data Assessment couldn't be filled in")
 
             # Insurance Status
             button_default_assessment_id = 'B1000006761_Renderer'
@@ -622,14 +660,15 @@ class Driver:
             self.__wait_until_page_fully_loaded('Universal Data Assessment')
 
             dropdown_covered_by_health_ins_id = '1000006802_Renderer'
-            dropdown_covered_by_health_ins = self.browser.find_element(By.ID, dropdown_covered_by_health_ins_id)
-            if self.__dropdown_empty(dropdown_covered_by_health_ins):
-                self.__select_assessment_dropdown_option(dropdown_covered_by_health_ins, option_data_not_collected_id)
+            if self.__fill_form('Universal Data Assessment', [
+                (dropdown_covered_by_health_ins_id, option_data_not_collected_id, True),
+            ]):
+                raise Exception("Universal Data Assessment couldn't be filled in")
 
             # Save
             button_save = self.browser.find_element(By.ID, button_save_id)
             button_save.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Couldn't complete initial assessment")
             print(traceback.format_exc())
@@ -641,7 +680,7 @@ class Driver:
         button_save_and_close_id = 'Renderer_SAVEFINISH'
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Barrier Assessment: Identified Date',
                 EC.element_to_be_clickable((By.ID, field_identified_date_id))
             )
 
@@ -651,26 +690,26 @@ class Driver:
             if len(button_default_assessment) > 1:
                 already_assessed = True
                 button_default_assessment[0].click()
-                time.sleep(3)
+                self.__wait_until_reloaded(button_default_assessment[0])
 
             dropdowns_xpath = '//table[@id="RendererResultSet"]//tr/td/select[@class="form-control"]'
             dropdowns = self.browser.find_elements(By.XPATH, dropdowns_xpath)
 
             # every fouth dropdown is a 'Barrier Present?' field
-            for i in range(0, len(dropdowns), 4):
-                if self.__dropdown_empty(dropdowns[i]):
-                    self.__select_assessment_dropdown_option(dropdowns[i], option_data_not_collected_id)
+            if self.__fill_form('Barrier Assessment', [(dropdowns[i], option_data_not_collected_id, True)
+                                                       for i in range(0, len(dropdowns), 4)]):
+                raise Exception("Barrier Assessment couldn't be filled in")
 
             # Save
             button_save_and_close = self.browser.find_element(By.ID, button_save_and_close_id)
             button_save_and_close.click()
-            time.sleep(2) 
+            self.__wait_until_reloaded(button_save_and_close)
 
             # depending on the case, it might have to click save and close twice
             if already_assessed and self.browser.find_elements(By.ID, button_save_and_close_id) > 1:
                 button_save_and_close = self.browser.find_element(By.ID, button_save_and_close_id)
                 button_save_and_close.click()
-                time.sleep(2) 
+                self.__wait_until_reloaded(button_save_and_close)
 
         except Exception as e:
             print("Couldn't complete barrier assessment")
@@ -686,7 +725,7 @@ class Driver:
         self.__wait_until_page_fully_loaded("Domestic Violence Assessment")
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Domestic Violence Assessment: Assessment Date',
                 EC.element_to_be_clickable((By.ID, field_assessment_date_id))
             )
             
@@ -698,12 +737,12 @@ class Driver:
                     is_empty = False
             if is_empty:
                 buttons_domestic_violence[4].click()
-                time.sleep(1)
+                self.__wait('Domestic Violence Assessment: Option Selected', EC.element_to_be_selected(buttons_domestic_violence[4]))
 
             # Save
             button_save = self.browser.find_element(By.ID, button_save_id)
             button_save.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Couldn't complete domestic violence assessment")
             print(traceback.format_exc())
@@ -721,21 +760,19 @@ class Driver:
         # FIX HERE, HANGING TODO
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Income Assessment: Assessment Date',
                 EC.element_to_be_clickable((By.ID, field_assessment_date_id))
             )
-            dropdown_income = self.browser.find_element(By.ID, dropdown_income_id)
-            if self.__dropdown_empty(dropdown_income):
-                self.__select_assessment_dropdown_option(dropdown_income, option_data_not_collected_id)
-
-            dropdown_cash_benefits = self.browser.find_element(By.ID, dropdown_non_cash_benefits_id)
-            if self.__dropdown_empty(dropdown_cash_benefits):
-                self.__select_assessment_dropdown_option(dropdown_cash_benefits, option_data_not_collected_id)
+            if self.__fill_form('Income Assessment', [
+                (dropdown_income_id, option_data_not_collected_id, True),
+                (dropdown_non_cash_benefits_id, option_data_not_collected_id, True),
+            ]):
+                raise Exception("Income Assessment couldn't be filled in")
 
             # Save
             button_save = self.browser.find_element(By.ID, button_save_id)
             button_save.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Couldn't complete income assessment")
             print(traceback.format_exc())
@@ -748,16 +785,18 @@ class Driver:
         button_save_id = "Renderer_SAVE"
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Current Living Situation Assessment: Living Situation',
                 EC.element_to_be_clickable((By.ID, dropdown_living_sit_id))
             )
-            dropdown_living_sit = self.browser.find_element(By.ID, dropdown_living_sit_id)
-            self.__select_assessment_dropdown_option(dropdown_living_sit, option_place_not_meant_for_habitation_id)
+            if self.__fill_form('Current Living Situation Assessment', [
+                (dropdown_living_sit_id, option_place_not_meant_for_habitation_id, False),
+            ]):
+                raise Exception("Current Living Situation Assessment couldn't be filled in")
 
             # Save
             button_save = self.browser.find_element(By.ID, button_save_id)
             button_save.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Couldn't complete current living situation assessment")
             print(traceback.format_exc())
@@ -772,17 +811,18 @@ class Driver:
         self.__wait_until_page_fully_loaded("Translation Assistance Assessment")
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Translation Assistance Assessment: Translation',
                 EC.element_to_be_clickable((By.ID, dropdown_translation_id))
             )
-            dropdown_translation = self.browser.find_element(By.ID, dropdown_translation_id)
-            if self.__dropdown_empty(dropdown_translation):
-                self.__select_assessment_dropdown_option(dropdown_translation, option_data_not_collected_id)
+            if self.__fill_form('Translation Assistance Assessment', [
+                (dropdown_translation_id, option_data_not_collected_id, True),
+            ]):
+                raise Exception("Translation Assistance Assessment couldn't be filled in")
 
             # Save
             button_save = self.browser.find_element(By.ID, button_save_id)
             button_save.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Couldn't complete translation assistance assessment")
             print(traceback.format_exc())
@@ -793,12 +833,12 @@ class Driver:
         button_finish_id = 'FinishButton'
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Finish Page: Finish',
                 EC.element_to_be_clickable((By.ID, button_finish_id))
             )
             button_finish = self.browser.find_element(By.ID, button_finish_id)
             button_finish.click()
-            time.sleep(1)
+            self.__wait_until_reloaded(button_finish)
         except Exception as e:
             print("Couldn't click the finish enrollment button")
             print(traceback.format_exc())
@@ -807,27 +847,131 @@ class Driver:
         # SUCCESS
         return True
 
-    def __dropdown_empty(self, dropdown):
-        selected_option = Select(dropdown).first_selected_option.text
-        return True if "SELECT" in selected_option else False
-    
+    # Works out which of the services to be entered aren't in the client's list of services yet
+    # @param: [dict] services_dict: services to be entered
+    #         [dict] all_services: every service the client got on the date of service
+    #         [dict] entered: units of each service already in the list, see '__read_entered_services'
+    # @return: [dict] services that still have to be entered, all of them if the list couldn't be read
+    def __get_missing_services(self, services_dict, all_services, entered):
+        if entered is None:
+            return services_dict
+        missing = {}
+        for service, service_count in services_dict.items():
+            # never more than what's left to reach the day's total
+            service_count = min(service_count, all_services.get(service, service_count) - entered.get(service, 0))
+            if service_count > 0:
+                missing[service] = service_count
+            else:
+                print(service + " is already in HMIS for this date")
+        return missing
+
+    # Reads the client's list of services once and totals the units of each service already in it
+    #   for the date of service, under one of the SALT enrollments
+    # IMPORTANT: This function can only work if the browser is on the client's 'Services' page
+    # @param: [list] viable_enrollment_list: list of favorable SALT enrollments
+    #         [str] service_date: date of service in format MMDDYYYY
+    #         [list] services: names of the services to look for
+    # @return: [dict] units of each service, None if the list couldn't be read
+    def __read_entered_services(self, viable_enrollment_list, service_date, services):
+        table_services_rows_xpath = "//table[@id='RendererResultSet']//tbody/tr"
+
+        self.__switch_to_iframe(self.iframe_id)
+        self.__wait_until_page_fully_loaded('Service')
+        self.__wait_until_result_set_fully_loaded()
+        try:
+            headers = self.browser.execute_script(
+                "return Array.from(document.querySelectorAll('#RendererResultSet thead th'), th => th.innerText.trim().toLowerCase());")
+            rows = self.__read_table(table_services_rows_xpath)
+        except Exception as e:
+            print("Couldn't read the client's services, entering all of them")
+            return None
+
+        def find_column(*names):
+            return next((i for i, header in enumerate(headers) if any(name in header for name in names)), None)
+        column_date = find_column('date')
+        column_service = next((i for i, header in enumerate(headers) if 'service' in header and 'date' not in header), None)
+        column_units = find_column('unit')
+        column_enrollment = find_column('enrollment', 'program', 'project')
+        if None in (column_date, column_service, column_units):
+            print("Couldn't find the columns of the client's services, entering all of them")
+            return None
+
+        # longest name first, so 'Laundry Products' isn't counted as 'Laundry' even when only 'Laundry' is entered
+        service_names = sorted(services, key=len, reverse=True)
+        entered = {}
+        for row in rows:
+            # skip group headers and rows without the full set of cells
+            if row['class'] == "gbHead" or len(row['cells']) < len(headers) - 1:
+                continue
+            # line the cells up with the headers from the right, some rows start with a header cell instead
+            cells = dict(zip(range(len(headers) - len(row['cells']), len(headers)), row['cells']))
+            date = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})', cells.get(column_date, ''))
+            if not date or "%02d%02d%s" % (int(date[1]), int(date[2]), date[3]) != service_date:
+                continue
+            if column_enrollment is not None and not any(salt_enrollment in cells.get(column_enrollment, '')
+                                                         for salt_enrollment in viable_enrollment_list):
+                continue
+            service = next((name for name in service_names if name.lower() in cells.get(column_service, '').lower()), None)
+            units = re.sub(r'[^0-9]', '', cells.get(column_units, ''))
+            if service and units:
+                entered[service] = entered.get(service, 0) + int(units)
+        return entered
+
+    # Checks the client's list of services for a service whose save wasn't acknowledged by the form
+    #   reloading, HMIS can save a service without replacing the 'Save' button
+    # @param: [list] viable_enrollment_list: list of favorable SALT enrollments
+    #         [str] service_date: date of service in format MMDDYYYY
+    #         [list] services: names of every service the client got on the date of service
+    #         [str] service: service that was saved
+    #         [int] service_count: units that were saved
+    #         [dict] entered: units of each service in the list before it was saved, None if it couldn't be read
+    # @return: [bool] true if the units were added to the list, the browser is left on the 'Services' page
+    def __service_saved(self, viable_enrollment_list, service_date, services, service, service_count, entered):
+        if entered is None:
+            return False
+        print("Checking the client's services for " + service)
+        if not self.navigate_to_client_dashboard() or not self.navigate_to_service_list():
+            return False
+        entered_now = self.__read_entered_services(viable_enrollment_list, service_date, services)
+        return entered_now is not None and entered_now.get(service, 0) >= entered.get(service, 0) + service_count
+
+    # Picks a SALT enrollment in the 'Add Service' form by its value, as long as it's still one of the
+    #   SALT enrollments
+    # @param: [str] dropdown_id: id of the enrollment dropdown
+    #         [str] option_value: value of the enrollment option
+    #         [list] viable_enrollment_list: list of favorable SALT enrollments
+    # @return: [bool] success / fail
+    def __select_enrollment(self, dropdown_id, option_value, viable_enrollment_list):
+        dropdown_option_xpath = '//select[@id="%s"]//option[@value="%s"]' %(dropdown_id, option_value)
+        try:
+            option = self.browser.find_element(By.XPATH, dropdown_option_xpath)
+            if not any(salt_enrollment in option.text for salt_enrollment in viable_enrollment_list):
+                return False
+            option.click()
+            self.__wait('Add Service: Enrollment Selected', EC.element_to_be_selected(option))
+            self.enrollment = (option_value, option.text.strip())
+            return True
+        except Exception as e:
+            return False
+
     # might only work on assessment page
     def __select_assessment_dropdown_option(self, dropdown, option_id):
         dropdown_id = dropdown.get_attribute("id")
         dropdown_option_xpath = '//select[@id="%s"]//option[@value="%s"]' %(dropdown_id, option_id)
         option = self.browser.find_element(By.XPATH, dropdown_option_xpath)
         option.click()
-        time.sleep(1)
+        self.__wait('Assessment: Option Selected', EC.element_to_be_selected(option))
+        self.__wait_until_postback_finished()
 
     def __default_last_assessment(self, button_default_assessment_id):
         # click default last assessment button and wait for page to load
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
-                EC.element_to_be_clickable((By.ID, button_default_assessment_id))
+            self.__wait('Assessment: Default Last Assessment',
+                EC.element_to_be_clickable((By.ID, button_default_assessment_id)), optional=True
             )
             button_default_assessment = self.browser.find_element(By.ID, button_default_assessment_id)
             button_default_assessment.click()
-            time.sleep(3)
+            self.__wait_until_reloaded(button_default_assessment)
         except Exception as e:
             # sometimes this button doesn't exist, just skip over
             print("Couldn't click last assessment button")
@@ -856,28 +1000,27 @@ class Driver:
         # check if client is enrolled in two SALT programs, if so skip over client and return true
         # else click on the enrollment and open the row's action menu
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Client Dashboard: Enrollments',
                 EC.visibility_of_element_located((By.XPATH, label_enrollment_row_name_xpath))
             )
             rows_enrollment_xpath = '//table[@id="wp85039573formResultSet"]/tbody/tr'
-            rows_enrollment = self.browser.find_elements(By.XPATH, rows_enrollment_xpath)
+            rows_enrollment = self.__read_table(rows_enrollment_xpath)
             stored_row = None
 
             for row in rows_enrollment:
                 # if row is a header (i.e. Active, Exited)
-                if row.get_attribute("class") == "gbHead":
+                if row['class'] == "gbHead":
                     # prevent from clicking on an expired enrollment
-                    label = row.find_element(By.XPATH, './td/a')
-                    if label.get_attribute("data-value") == "Exited":
+                    if row['link'] == "Exited":
                         break
                 # if row contains enrollment data
                 else:
-                    label_enrollment_name = row.find_element(By.XPATH, './td[6]').text
+                    label_enrollment_name = row['cells'][5]
                     if 'SALT' in label_enrollment_name:
                         if stored_row:
                             print("Enrolled in multiple SALT projects")
                             return True # skip over current client and return success
-                        stored_row = row
+                        stored_row = row['row']
             # For Loop End
 
             # no valid SALT enrollments, has probably been exited from a program
@@ -886,8 +1029,7 @@ class Driver:
                 return True
 
             menu_action = stored_row.find_element(By.CLASS_NAME, 'action-menu')
-            self.browser.execute_script("arguments[0].scrollIntoView();", menu_action)
-            time.sleep(1)
+            self.__scroll_into_view(menu_action)
             menu_action.click()
 
         except Exception as e:
@@ -897,7 +1039,7 @@ class Driver:
 
         # wait for action menu to appear
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Action Menu',
                 EC.visibility_of_element_located((By.ID, menu_id))
             )
         except Exception as e:
@@ -907,7 +1049,7 @@ class Driver:
 
         # select the 'edit enrollment' link option from the action menu
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Action Menu: Link',
                 EC.element_to_be_clickable((By.ID, link_id))
             )
             link = self.browser.find_element(By.ID, link_id)
@@ -922,7 +1064,7 @@ class Driver:
         self.__switch_to_iframe(self.iframe_id)
         self.__wait_until_page_fully_loaded('Edit Enrollment')
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Edit Enrollment: Date of Engagement',
                 EC.visibility_of_any_elements_located((By.XPATH, field_date_of_engagement_xpath))
             )
         except:
@@ -932,23 +1074,18 @@ class Driver:
 
         try:
             # find our current client among table of family members to update date of engagement
-            rows_family_members = self.browser.find_elements(By.XPATH, table_row_family_members_xpath)
+            rows_family_members = self.__read_table(table_row_family_members_xpath)
             for row in reversed(rows_family_members):
-                select_rel_to_head_of_household = row.find_elements(By.XPATH, './td/select')[0]
-                dropdown_rel_to_head_of_household = Select(select_rel_to_head_of_household)
-                rel_to_head_of_household = dropdown_rel_to_head_of_household.first_selected_option.text
+                rel_to_head_of_household = row['selects'][0]
                 if rel_to_head_of_household == "Self":
-                    field_date_of_engagement = row.find_elements(By.XPATH, './td/span/input')[5]
-                    WebDriverWait(self.browser, self.wait_time).until(EC.element_to_be_clickable(field_date_of_engagement))
-                    time.sleep(1)
-                    self.browser.execute_script("arguments[0].scrollIntoView();", field_date_of_engagement)
-                    time.sleep(1)
+                    field_date_of_engagement = row['row'].find_elements(By.XPATH, './td/span/input')[5]
+                    self.__scroll_into_view(field_date_of_engagement)
                     field_date_of_engagement.click()
-                    time.sleep(1)
                     field_date_of_engagement.clear()
-                    time.sleep(1)
+                    self.__wait_until_value_committed(field_date_of_engagement, "")
                     button_save = self.browser.find_element(By.ID, button_save_id)
                     button_save.click()
+                    self.__wait_until_reloaded(button_save)
         except Exception as e:
             print("Date of Engagement field does not exist")
             return True # sometimes the field does not exist for the user, I'm not sure why
@@ -982,7 +1119,7 @@ class Driver:
 
         # update Date of Engagement field
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Edit Enrollment: Date of Engagement',
                 EC.visibility_of_any_elements_located((By.XPATH, field_date_of_engagement_xpath))
             )
             # check if the client has had any assessments done (required for update)
@@ -990,26 +1127,22 @@ class Driver:
             if not field_assessment.get_attribute("value"):
                 return False
             # find our current client among table of family members to update date of engagement
-            rows_family_members = self.browser.find_elements(By.XPATH, table_row_family_members_xpath)
+            rows_family_members = self.__read_table(table_row_family_members_xpath)
             for row in reversed(rows_family_members):
-                select_rel_to_head_of_household = row.find_elements(By.XPATH, './td/select')[0]
-                dropdown_rel_to_head_of_household = Select(select_rel_to_head_of_household)
-                rel_to_head_of_household = dropdown_rel_to_head_of_household.first_selected_option.text
+                rel_to_head_of_household = row['selects'][0]
                 if rel_to_head_of_household == "Self":
-                    field_date_of_engagement = row.find_elements(By.XPATH, './td/span/input')[5]
-                    WebDriverWait(self.browser, self.wait_time).until(EC.element_to_be_clickable(field_date_of_engagement))
-                    time.sleep(1)
-                    self.browser.execute_script("arguments[0].scrollIntoView();", field_date_of_engagement)
-                    time.sleep(1)
+                    field_date_of_engagement = row['row'].find_elements(By.XPATH, './td/span/input')[5]
+                    self.__scroll_into_view(field_date_of_engagement)
                     field_date_of_engagement.click()
-                    time.sleep(1)
                     field_date_of_engagement.clear()
-                    time.sleep(1)
+                    self.__wait_until_value_committed(field_date_of_engagement, "")
                     field_date_of_engagement.send_keys(service_date)
-                    time.sleep(1)
+                    if not self.__wait_until_value_committed(field_date_of_engagement, service_date):
+                        return False
                     button_save = self.browser.find_element(By.ID, button_save_id)
                     button_save.click()
-                    time.sleep(1)
+                    if not self.__wait_until_reloaded(button_save):
+                        return False
         except Exception as e:
             print("Couldn't update Date of Engagement")
             print(traceback.format_exc())
@@ -1022,25 +1155,17 @@ class Driver:
     # This function can be accessed from any page in HMIS
     # @return: [bool] success / fail 
     def navigate_to_client_dashboard(self):
-        button_nav_clients_page_id = "ws_2_tab"
         button_nav_dashboard_page_id = "o1000000033"
 
-        # find 'Clients' button on left sidebar
-        self.browser.switch_to.default_content()
-        try:
-            WebDriverWait(self.browser, self.wait_time).until(
-                EC.element_to_be_clickable((By.ID, button_nav_clients_page_id))
-            )
-            button_clients = self.browser.find_element(By.ID, button_nav_clients_page_id)
-            button_clients.click()
-        except Exception as e:
-            print("Couldn't navigate to 'Clients' page")
-            print(traceback.format_exc())
+        # already on the dashboard i.e. right after finding the client
+        if self.__on_page('Client Dashboard'):
+            return True
+        if not self.__open_clients_workspace():
             return False
 
         # click 'Dashboard' button in sidebar
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Clients: Dashboard',
                 EC.element_to_be_clickable((By.ID, button_nav_dashboard_page_id))
             )
             button_dashboard = self.browser.find_element(By.ID, button_nav_dashboard_page_id)
@@ -1048,22 +1173,23 @@ class Driver:
         except Exception as e:
             print("Couldn't navigate to 'Dashboard' page")
             print(traceback.format_exc())
+            self.__reset_state()
             return False
+        return True
 
     # This function can be accessed from any page in HMIS
     # @return: [bool] success / fail
     def navigate_to_find_client(self):
         button_nav_find_clients_page_id = "o1000000037"
 
-        self.navigate_to_client_dashboard()
+        # the 'Find Client' button is in the same sidebar as 'Dashboard', there's no need
+        #   to load the dashboard first if the 'Clients' workspace is already open
+        if not self.__open_clients_workspace():
+            return False
         
-        # find 'Find Client' button on left sidebar after waiting for client dashboard to fully load
+        # find 'Find Client' button on left sidebar
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
-                EC.frame_to_be_available_and_switch_to_it((By.ID, self.iframe_id))
-            ) 
-            self.browser.switch_to.default_content()
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Clients: Find Client',
                 EC.element_to_be_clickable((By.ID, button_nav_find_clients_page_id))
             )
             button_find_client = self.browser.find_element(By.ID, button_nav_find_clients_page_id)
@@ -1071,6 +1197,36 @@ class Driver:
         except Exception as e:
             print("Couldn't open 'Find Client' page")
             print(traceback.format_exc())
+            self.__reset_state()
+            return False
+        return True
+
+    # Opens the 'Clients' workspace in the left sidebar, unless it's already open
+    # @return: [bool] success / fail
+    def __open_clients_workspace(self):
+        button_nav_clients_page_id = "ws_2_tab"
+        button_nav_dashboard_page_id = "o1000000033"
+
+        self.__switch_to_default_content()
+        if self.workspace == 'Clients':
+            # make sure the sidebar is still there, the whole page may have been reloaded
+            buttons_dashboard = self.browser.find_elements(By.ID, button_nav_dashboard_page_id)
+            if buttons_dashboard and buttons_dashboard[0].is_displayed():
+                return True
+            self.__reset_state()
+
+        # find 'Clients' button on left sidebar
+        try:
+            self.__wait('Clients Tab',
+                EC.element_to_be_clickable((By.ID, button_nav_clients_page_id))
+            )
+            button_clients = self.browser.find_element(By.ID, button_nav_clients_page_id)
+            button_clients.click()
+            self.workspace = 'Clients'
+        except Exception as e:
+            print("Couldn't navigate to 'Clients' page")
+            print(traceback.format_exc())
+            self.__reset_state()
             return False
         return True
 
@@ -1083,7 +1239,7 @@ class Driver:
         self.__wait_until_page_fully_loaded("Client Dashboard")
         self.__switch_to_iframe(self.iframe_id)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Client Dashboard: Services',
                 EC.element_to_be_clickable((By.XPATH, link_services_xpath))
             )
             link_services = self.browser.find_element(By.XPATH, link_services_xpath)
@@ -1103,7 +1259,7 @@ class Driver:
 
         self.__switch_to_iframe(self.iframe_id)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Client Dashboard: Enrollments Link',
                 EC.element_to_be_clickable((By.XPATH, link_enrollments_xpath))
             )
             link_enrollments = self.browser.find_element(By.XPATH, link_enrollments_xpath)
@@ -1148,41 +1304,39 @@ class Driver:
             enrollment_ranking_dict[viable_enrollment_list[i]] = i
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Client Dashboard: Enrollments',
                 EC.visibility_of_element_located((By.XPATH, label_enrollment_row_name_xpath))
             )
             rows_enrollment_xpath = '//table[@id="wp85039573formResultSet"]/tbody/tr'
             cont = True
 
-            rows_enrollment = self.browser.find_elements(By.XPATH, rows_enrollment_xpath)
+            rows_enrollment = self.__read_table(rows_enrollment_xpath)
             stored_ranking = len(enrollment_ranking_dict)
             for row in rows_enrollment:
                 if not cont:
                     break
                 # if row is a header (i.e. Active, Exited)
-                if row.get_attribute("class") == "gbHead":
+                if row['class'] == "gbHead":
                     # prevent from clicking on an expired enrollment
-                    label = row.find_element(By.XPATH, './td/a')
-                    if label.get_attribute("data-value") == "Exited":
+                    if row['link'] == "Exited":
                         cont = False
                         break
                 # if row contains enrollment data
                 else:
-                    label_enrollment_name = row.find_element(By.XPATH, './td[6]').text
+                    label_enrollment_name = row['cells'][5]
                     for enrollment, ranking in enrollment_ranking_dict.items():
                         if enrollment in label_enrollment_name and ranking < stored_ranking:
                             # ranking indicates that we'd like to update newer enrollments over older ones
                             stored_ranking = ranking
                             # get the parent element of where the label is located
-                            stored_row = row
+                            stored_row = row['row']
                             break
             # For Loop End
 
             # click the best match
             if stored_ranking < len(enrollment_ranking_dict):
                 menu_action = stored_row.find_element(By.CLASS_NAME, 'action-menu')
-                self.browser.execute_script("arguments[0].scrollIntoView();", menu_action)
-                time.sleep(1)
+                self.__scroll_into_view(menu_action)
                 menu_action.click()
             else:
                 return False
@@ -1193,7 +1347,7 @@ class Driver:
 
         # wait for action menu to appear
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Action Menu',
                 EC.visibility_of_element_located((By.ID, menu_id))
             )
         except Exception as e:
@@ -1203,7 +1357,7 @@ class Driver:
 
         # select the desired link option from the action menu
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Action Menu: Link',
                 EC.element_to_be_clickable((By.ID, link_id))
             )
             link = self.browser.find_element(By.ID, link_id)
@@ -1221,21 +1375,20 @@ class Driver:
         button_dialog_yes_id = 'YesButton'
 
         self.__wait_until_page_fully_loaded("Intake")
-        self.browser.switch_to.default_content()
+        self.__switch_to_default_content()
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Intake: Cancel Workflow',
                 EC.element_to_be_clickable((By.XPATH, button_cancel_workflow_xpath))
             )
             button_cancel_workflow = self.browser.find_element(By.XPATH, button_cancel_workflow_xpath)
             button_cancel_workflow.click()
 
-            self.browser.switch_to.default_content()
             # update id for iframe, it increments by one every time its open
             # which like... why ????? who coded this ???
             current_dialog_iframe = self.iframe_dialog_id + str(self.iframe_dialog_counter)
             self.iframe_dialog_counter += 1
             self.__switch_to_iframe(current_dialog_iframe)
-            WebDriverWait(self.browser, self.wait_time).until(EC.element_to_be_clickable((By.ID, button_dialog_yes_id)))
+            self.__wait('Cancel Dialog: Yes', EC.element_to_be_clickable((By.ID, button_dialog_yes_id)))
             button_dialog_yes = self.browser.find_element(By.ID, button_dialog_yes_id)
             button_dialog_yes.click()
         except Exception as e:
@@ -1251,16 +1404,78 @@ class Driver:
     # Returns a ratio showing how similar two strings are
     # @param: [str] a: string to be compared
     #         [str] b: string to be compared
-    # @return: [int] similarity score
+    # @return: [float] similarity score
     def __similar(self, a, b):
-        score = difflib.SequenceMatcher(a=a.lower(), b=b.lower()).ratio()
-        return score
+        return name_matcher.similarity(name_matcher.normalize(a), name_matcher.normalize(b))
+
+    # Waits for a condition with the timeout learned for the named wait, and records how long it took
+    # @param: [str] name: name of the wait i.e. the page or field being waited on
+    #         [function] condition: expected condition to wait for
+    #         [bool] optional: the element sometimes doesn't exist, so timing out isn't a sign of a slow page
+    #         [float] min_timeout: shortest timeout to use, whatever has been learned
+    # @return: the result of the condition
+    def __wait(self, name, condition, optional=False, min_timeout=0):
+        timeout = max(self.timeouts.get(name), min_timeout)
+        start_time = time.perf_counter()
+        try:
+            result = WebDriverWait(self.browser, timeout).until(condition)
+        except TimeoutException as e:
+            # the page may be waiting on a session that's no longer logged in
+            if not self.logged_out and self.__session_expired():
+                print("HMIS session has expired")
+                self.logged_out = True
+            elif not optional:
+                self.timeouts.record(name, timeout, timed_out=True)
+            raise
+        self.timeouts.record(name, time.perf_counter() - start_time)
+        return result
+
+    # Reads every row of a table in one call to the browser instead of one call per cell, i.e. a
+    #   'RendererResultSet' or 'RendererSF1ResultSet' table
+    # @param: [str] rows_xpath: xpath of the rows of the table
+    # @return: [list] one dict per row, with the 'row' element to click on, its 'class', the text of its
+    #                 'header' (th) and 'cells' (td), the 'data-value' of the 'link' in its first cell
+    #                 and the selected option of each of its dropdowns in 'selects'
+    def __read_table(self, rows_xpath):
+        script = """
+            var rows = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var table = [];
+            for (var i = 0; i < rows.snapshotLength; i++) {
+                var row = rows.snapshotItem(i);
+                var header = row.querySelector(':scope > th');
+                var link = row.querySelector(':scope > td > a');
+                table.push({
+                    row: row,
+                    class: row.getAttribute('class') || '',
+                    header: header ? header.innerText.trim() : '',
+                    cells: Array.from(row.querySelectorAll(':scope > td'), cell => cell.innerText.trim()),
+                    link: link ? link.getAttribute('data-value') : null,
+                    selects: Array.from(row.querySelectorAll(':scope > td > select'),
+                                        select => select.selectedIndex < 0 ? '' : select.options[select.selectedIndex].text.trim())
+                });
+            }
+            return table;
+        """
+        return self.browser.execute_script(script, rows_xpath)
+
+    # Waits for the client's dashboard and reads the name at the top of it
+    # @return: [str] first name on the dashboard
+    #          [str] last name on the dashboard
+    def __read_dashboard_name(self):
+        label_client_name_xpath = '//td[@class="Header ZoneTopRow_2"]//a'
+
+        self.__wait('Client Dashboard: Name',
+            EC.presence_of_element_located((By.XPATH, label_client_name_xpath))
+        )
+        dashboard_title = self.browser.find_element(By.XPATH, label_client_name_xpath).get_attribute("title")
+        dashboard_name = dashboard_title.split("'s")[0]
+        return dashboard_name.split(" ", 1)[0], dashboard_name.split(" ", 1)[1]
 
     # Waits until a page is fully loaded before continuing
     # @param: [str] page_name: the name of the page to be printed in output to make debug easier
     def __wait_until_page_fully_loaded(self, page_name):
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait(page_name,
                 lambda browser: browser.execute_script('return document.readyState') == 'complete')
         except Exception as e:
             print("Error loading" + page_name + " page")
@@ -1270,21 +1485,251 @@ class Driver:
     #   results to load i.e. Enrollments, Services by checking for result set element
     def __wait_until_result_set_fully_loaded(self):
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Result Set',
                 EC.visibility_of_element_located((By.ID, "RendererResultSet"))
             )
         except Exception as e:
             print("Error loading frame")
             print(traceback.format_exc())
 
-    # Focus on iframe with given ID
+    # Waits until the page has finished the request started by the last change, i.e. a dropdown
+    #   that reloads the fields below it
+    def __wait_until_postback_finished(self):
+        try:
+            self.__wait('Postback',
+                lambda browser: browser.execute_script(
+                    "return document.readyState == 'complete' && (!window.jQuery || jQuery.active == 0)"))
+        except Exception as e:
+            print("Page is still busy, continuing")
+
+    # Waits until a field holds the value that was typed into it, ignoring the formatting
+    #   the page adds i.e. '01312024' -> '01/31/2024'
+    # @param: [WebElement] field: text field
+    #         [str] value: value that was typed in, empty if the field was cleared
+    # @return: [bool] success / fail
+    def __wait_until_value_committed(self, field, value):
+        expected = "".join(c for c in str(value) if c.isalnum())
+        try:
+            self.__wait('Field Value',
+                lambda browser: "".join(c for c in (field.get_property("value") or "") if c.isalnum()) == expected)
+            return True
+        except Exception as e:
+            print("Field value '" + str(value) + "' wasn't committed")
+            return False
+
+    # Waits until a page acknowledges a click by reloading, i.e. after hitting save the form
+    #   is posted back and the old button is gone
+    # @param: [WebElement] button: the button that was clicked
+    # @return: [bool] success / fail
+    def __wait_until_reloaded(self, button):
+        try:
+            self.__wait('Reload', EC.staleness_of(button))
+            self.__wait_until_postback_finished()
+            return True
+        except Exception as e:
+            print("Page didn't reload after clicking '" + str(button.get_attribute("value") or button.get_attribute("id")) + "'")
+            return False
+
+    # Fills in a whole form in one call to the browser, setting every field and firing the 'input' and
+    #   'change' events the page listens to as if each one was filled in by hand, then reads all of
+    #   them back in one more call. Any field that didn't take its value is filled in by hand.
+    # @param: [str] page_name: name of the form, for output
+    #         [list] fields: (field, value, only fill in if empty) for each field, the field is either the id
+    #                        or the element, dropdowns take the value of the option to select
+    # @return: [list] fields that still don't have the right value
+    def __fill_form(self, page_name, fields):
+        script = """
+            var filled = [];
+            arguments[0].forEach(function (field, i) {
+                var element = typeof field[0] === 'string' ? document.getElementById(field[0]) : field[0];
+                if (!element) return;
+                if (field[2]) {
+                    var empty = element.tagName == 'SELECT'
+                        ? element.selectedIndex < 0 || element.options[element.selectedIndex].text.indexOf('SELECT') >= 0
+                        : !element.value;
+                    if (!empty) return;
+                }
+                element.value = field[1];
+                ['input', 'change'].forEach(function (type) {
+                    element.dispatchEvent(new Event(type, {bubbles: true}));
+                });
+                filled.push(i);
+            });
+            return filled;
+        """
+        filled = [fields[i] for i in self.browser.execute_script(script, [list(field) for field in fields])]
+        if not filled:
+            return []
+        # a dropdown can post the form back when it changes, wait for it before reading the values
+        self.__wait_until_postback_finished()
+        self.__wait_until_page_fully_loaded(page_name)
+
+        try:
+            values = self.browser.execute_script("""
+                return arguments[0].map(function (field) {
+                    var element = typeof field === 'string' ? document.getElementById(field) : field;
+                    return element ? element.value : null;
+                });
+            """, [field for field, value, only_if_empty in filled])
+        except Exception as e:
+            # the page reloaded, anything passed in as an element has to be found again by hand
+            values = [None] * len(filled)
+
+        failed = []
+        for (field, value, only_if_empty), current_value in zip(filled, values):
+            if self.__same_value(current_value, value):
+                continue
+            print("'" + page_name + "' didn't take the value '" + value + "', filling it in by hand")
+            try:
+                element = self.browser.find_element(By.ID, field) if isinstance(field, str) else field
+                if element.tag_name == 'select':
+                    self.__select_assessment_dropdown_option(element, value)
+                else:
+                    element.clear()
+                    element.send_keys("".join(c for c in value if c.isalnum()))
+                    self.__wait_until_value_committed(element, value)
+                if self.__same_value(element.get_property("value"), value):
+                    continue
+            except Exception as e:
+                print(traceback.format_exc())
+            failed.append((field, value, only_if_empty))
+        return failed
+
+    # Compares the value of a field ignoring the formatting the page adds i.e. '01312024' -> '01/31/2024'
+    def __same_value(self, current_value, value):
+        if current_value is None:
+            return False
+        return "".join(c for c in current_value if c.isalnum()) == "".join(c for c in value if c.isalnum())
+
+    # @param: [str] date: date with no non-numeric values i.e. '01312024'
+    # @return: [str] date the way it's shown in a date field i.e. '01/31/2024'
+    def __format_date(self, date):
+        return date[:2] + "/" + date[2:4] + "/" + date[4:]
+
+    # Scrolls an element into view and waits until it can be clicked
+    def __scroll_into_view(self, element, block="start"):
+        self.browser.execute_script("arguments[0].scrollIntoView({block: '%s'});" % block, element)
+        self.__wait('Scroll', EC.element_to_be_clickable(element))
+
+    # Focus on iframe with given ID, skipped if it's already in focus
     # @param: [str] iframe_id: id of the iframe to be found
     def __switch_to_iframe(self, iframe_id):
-        self.browser.switch_to.default_content()
+        if self.frame == iframe_id:
+            frame, page = self.__read_frame_state()
+            if frame == iframe_id:
+                return
+            # the iframe was replaced since it was focused on i.e. the whole page reloaded
+            self.__reset_state()
+
+        self.__switch_to_default_content()
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Frame',
                 EC.frame_to_be_available_and_switch_to_it((By.ID, iframe_id))
             )
+            self.frame = iframe_id
         except Exception as e:
             print("Couldn't focus on iframe")
             print(traceback.format_exc())
+
+    # Focus on the main page, skipped if it's already in focus
+    def __switch_to_default_content(self):
+        if self.frame is not None:
+            self.browser.switch_to.default_content()
+            self.frame = None
+
+    # Checks that a page is still loaded in the main iframe, the page is remembered with '__set_page'
+    #   and forgotten as soon as the iframe loads anything else
+    # @param: [str] page_name: name of the page
+    # @return: [bool] true if the page is loaded
+    def __on_page(self, page_name):
+        if self.page != page_name:
+            return False
+        if self.frame != self.iframe_id:
+            self.__switch_to_iframe(self.iframe_id)
+        frame, page = self.__read_frame_state()
+        if frame != self.iframe_id or page != page_name:
+            self.page = None
+            return False
+        return True
+
+    # Remembers the page loaded in the iframe in focus, by leaving a marker on the page itself
+    #   that goes away when the iframe loads another page
+    # @param: [str] page_name: name of the page
+    def __set_page(self, page_name):
+        try:
+            self.browser.execute_script("window.saltPage = arguments[0];", page_name)
+            self.page = page_name
+        except Exception as e:
+            self.page = None
+
+    # @return: [str] id of the iframe in focus, None if it's the main page or it can't be reached
+    #          [str] page marked by '__set_page' in the iframe, None if it has loaded another page since
+    def __read_frame_state(self):
+        try:
+            frame, page = self.browser.execute_script(
+                "return [window.frameElement ? window.frameElement.id : null, window.saltPage || null];")
+            return frame, page
+        except Exception as e:
+            return None, None
+
+    # Checks whether the session has expired, i.e. the login page is showing, in the main page or
+    #   any iframe, or a dialog says the session has ended
+    # @return: [bool] true if the session has expired
+    def __session_expired(self):
+        script = """
+            function expired(doc) {
+                if (doc.getElementById('UserName') && doc.getElementById('Password')) {
+                    return true;
+                }
+                var text = doc.body ? doc.body.innerText.toLowerCase() : '';
+                if (/session (has )?(expired|timed out|ended)|you have been logged out/.test(text)) {
+                    return true;
+                }
+                return Array.from(doc.querySelectorAll('iframe')).some(function (frame) {
+                    try {
+                        return frame.contentDocument && expired(frame.contentDocument);
+                    } catch (e) {
+                        return false;
+                    }
+                });
+            }
+            return expired(window.top.document);
+        """
+        try:
+            return self.browser.execute_script(script)
+        except Exception as e:
+            return False
+
+    # Logs back in with the login the session was started with, no more than once every
+    #   'relogin_interval' seconds and no more than 'max_relogins' times
+    # @return: [bool] success / fail
+    def __log_back_in(self):
+        if not self.credentials:
+            return False
+        if self.relogins >= self.max_relogins:
+            print("Already logged back in " + str(self.relogins) + " times, not trying again")
+            return False
+        wait = self.last_login + self.relogin_interval - time.time()
+        if wait > 0:
+            time.sleep(wait)
+
+        self.relogins += 1
+        print("Logging back into HMIS Clienttrack")
+        self.__reset_state()
+        try:
+            self.open_clienttrack()
+            return self.login_clienttrack(*self.credentials)
+        except Exception as e:
+            print("Couldn't log back into HMIS Clienttrack")
+            print(traceback.format_exc())
+            return False
+
+    # Forgets everything known about the browser, used when it's not showing what was expected
+    def __reset_state(self):
+        self.workspace = None
+        self.frame = None
+        self.page = None
+        try:
+            self.browser.switch_to.default_content()
+        except Exception as e:
+            pass
@@ -0,0 +1,95 @@
+import pandas as pd
+import re
+
+'''
+Catalog of the service and item codes used in the SALT reports for each location, and the
+HMIS service category each item is entered under. Adding a new location or a new item only
+requires adding its codes below, the matchers are built from this data.
+'''
+catalogs = {
+    # Orlando
+    'ORL': {
+        'services': ['Shower', 'Laundry', 'Case Management'],
+        'items': {
+            'Clothing': ['TOP', 'BTM', 'UND', 'SKS', 'SHO', 'BXR', 'Diabetic Socks', 'Backpacks', 'Belts'],
+            'Grooming': ['DDR', 'TBR', 'TPS', 'Razors', 'Adult Depends', 'Band Aid', 'Tampons', 'Bar Soap',
+                         'Deodorant', 'QTIPS', 'Hygiene Bag', 'Comb', 'Nail Clippers', 'Q-tips', 'Conditioner',
+                         'Chapstick'],
+            'Food': ['SBG'],
+            'Bedding': ['Blankets'],
+        },
+    },
+    # Sanford
+    'SEM': {
+        'services': ['Shower', 'Laundry', 'Case Management'],
+        'items': {
+            'Clothing': ['Black Bags', 'Men\'s pant', 'Men\'s Top', 'Shoes', 'Socks', 'Underwear',
+                         'Women\'s Bottom', 'Women\'s Top', 'Boxer'],
+            'Grooming': ['Feminine pads', 'Hygiene Bag', 'Razors', 'Soap bars', 'Tampons', 'Toothbrush',
+                         'Toothpaste', 'Deodorant'],
+            'Food': ['Snack', 'Water'],
+            'Bedding': ['Tent', 'Blankets'],
+        },
+    },
+}
+
+'''
+Compiles a location's catalog into a single pattern per column, so a 'Service' or 'Items'
+string is only scanned once no matter how many codes the location has.
+'''
+class ItemMatcher:
+    def __init__(self, location):
+        catalog = catalogs[location]
+        self.service_codes = catalog['services']
+        self.categories = list(catalog['items'].keys())
+        self.item_categories = {}
+        for category, codes in catalog['items'].items():
+            for code in codes:
+                self.item_categories[code] = category
+
+        self.service_pattern = self.__compile(self.service_codes)
+        self.item_pattern = self.__compile(list(self.item_categories.keys()))
+
+    # Tokenizes a single 'Items' string and totals the items under each category
+    # @param: [str] items: raw 'Items' string from the report i.e. 'TOP: 1, SKS: 2'
+    # @return: [dict] total count of items for each category
+    def match(self, items):
+        totals = dict.fromkeys(self.categories, 0)
+        if not isinstance(items, str):
+            return totals
+        for found in self.item_pattern.finditer(items):
+            totals[self.item_categories[found.group('code')]] += int(found.group('count'))
+        return totals
+
+    # Finds every service in a column in a single pass
+    # @param: [Series] column: the 'Service' column of the report
+    # @return: [DataFrame] total count of each service for each row, indexed like the column
+    def count_services(self, column):
+        return self.__count_codes(column, self.service_pattern, self.service_codes)
+
+    # Finds every item in a column in a single pass and totals them under their category
+    # @param: [Series] column: the 'Items' column of the report
+    # @return: [DataFrame] total count of each category for each row, indexed like the column
+    def count_items(self, column):
+        counts = self.__count_codes(column, self.item_pattern, list(self.item_categories.keys()))
+        return counts.T.groupby(self.item_categories).sum().T.reindex(columns=self.categories, fill_value=0)
+
+    # Builds one alternation of every code, trying longer codes first so that an entry like
+    #   'Diabetic Socks' is never also counted as 'Socks'
+    # @param: [list] codes: codes to be matched
+    # @return: [Pattern] compiled pattern with a 'code' and a 'count' group
+    def __compile(self, codes):
+        alternation = "|".join(re.escape(code) for code in sorted(set(codes), key=len, reverse=True))
+        # the count follows the first ':' after the code and can be more than one digit
+        return re.compile(r"(?<!\w)(?P<code>" + alternation + r")[^:]*:\s*(?P<count>\d+)")
+
+    def __count_codes(self, column, pattern, codes):
+        # anything that isn't a string i.e. an empty cell comes back as NaN and is dropped
+        found = column.str.findall(pattern).explode().dropna()
+        if found.empty:
+            return pd.DataFrame(0, index=column.index, columns=codes)
+
+        matches = pd.DataFrame(found.tolist(), index=found.index, columns=['code', 'count'])
+        matches['count'] = matches['count'].astype(int)
+        counts = matches.pivot_table(index=matches.index, columns='code', values='count', aggfunc='sum', fill_value=0)
+        return counts.reindex(index=column.index, columns=codes, fill_value=0)
@@ -0,0 +1,129 @@
+from functools import lru_cache
+import re
+
+'''
+Matches the name of a client from the SALT report against the names in HMIS. Names are cleaned
+up once (case, punctuation and nicknames in quotes) and a client is scored against a whole list
+of search results in one call, instead of comparing the raw strings of every pair over and over.
+
+Scores are on the same 0 - 1 scale per name as difflib's ratio, so the thresholds below mean
+the same thing they always have: 2 * (longest common subsequence) / (total length of both names).
+'''
+# a dashboard name (first + last) has to score at least this to be the client searched by ID
+min_id_score = 0.80
+# a search result (first + last) has to score at least this to be picked
+min_result_score = 1.4
+# a search result has to score at least this when matching three names (first, middle and last)
+min_three_name_score = 2
+
+# Cleans up a name so it can be compared, i.e. 'O\'Neil "Red"' -> 'oneil'
+# @param: [str] name: name as it's written in SALT or HMIS
+# @return: [str] lowercase name without punctuation or nicknames in quotes
+@lru_cache(maxsize=4096)
+def normalize(name):
+    name = str(name).lower()
+    # a nickname in quotes isn't part of the legal name, unless it's all there is
+    without_nickname = re.sub(r'"[^"]*"', ' ', name)
+    if without_nickname.strip():
+        name = without_nickname
+    name = re.sub(r"[^a-z\s-]", "", name).replace("-", " ")
+    return " ".join(name.split())
+
+# Returns a ratio showing how similar two names are, both names should already be normalized
+# @param: [str] a: name to be compared
+#         [str] b: name to be compared
+# @return: [float] similarity score between 0 and 1
+@lru_cache(maxsize=65536)
+def similarity(a, b):
+    if not a and not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return 2 * _lcs_length(a, b) / (len(a) + len(b))
+
+# Length of the longest common subsequence, computed a whole row at a time with bit operations
+def _lcs_length(a, b):
+    masks = _character_masks(a)
+    row = (1 << len(a)) - 1
+    for character in b:
+        match = row & masks.get(character, 0)
+        row = (row + match) | (row - match)
+    row &= (1 << len(a)) - 1
+    return len(a) - bin(row).count("1")
+
+@lru_cache(maxsize=4096)
+def _character_masks(name):
+    masks = {}
+    for i, character in enumerate(name):
+        masks[character] = masks.get(character, 0) | (1 << i)
+    return masks
+
+'''
+A client's name from the SALT report, cleaned up once and compared against names in HMIS
+'''
+class NameMatcher:
+    def __init__(self, first_name, last_name):
+        self.first_name = normalize(first_name)
+        self.last_name = normalize(last_name)
+        # every name the client goes by i.e. 'Edward Powell James' -> ['edward', 'powell', 'james']
+        self.names = self.last_name.split(" ", 1) + [self.first_name]
+
+    # Scores a name, checking the first and last name the right way around and swapped, as they're
+    #   sometimes entered backwards
+    # @param: [str] first_name: first name in HMIS
+    #         [str] last_name: last name in HMIS
+    # @return: [float] best score of the two, out of 2
+    def score(self, first_name, last_name):
+        first_name = normalize(first_name)
+        last_name = normalize(last_name)
+        return max(similarity(first_name, self.first_name) + similarity(last_name, self.last_name),
+                   similarity(first_name, self.last_name) + similarity(last_name, self.first_name))
+
+    # Checks the name on a client's dashboard after searching by ID
+    # @return: [bool] true if the name is close enough to be the same client
+    def matches(self, first_name, last_name):
+        return self.score(first_name, last_name) >= min_id_score
+
+    # Picks the best match out of a list of search results, first by first and last name,
+    #   then by every combination of first, middle and last name if none of them were close enough
+    # @param: [list] results: (first name, last name, middle name) of each result in HMIS
+    # @return: [int] index of the best result, None if none of them were close enough
+    def best_result(self, results):
+        results = [tuple(normalize(name) for name in result) for result in results]
+
+        best_index, best_score = None, 0
+        for i, (first_name, last_name, middle_name) in enumerate(results):
+            for score in (similarity(first_name, self.first_name) + similarity(last_name, self.last_name),
+                          similarity(first_name, self.last_name) + similarity(last_name, self.first_name)):
+                if score >= min_result_score and score > best_score:
+                    best_index, best_score = i, score
+        if best_index is not None:
+            return best_index
+
+        for i, (first_name, last_name, middle_name) in enumerate(results):
+            score, min_score = self.__score_middle_name(first_name, last_name, middle_name)
+            if score >= min_score and score > best_score:
+                best_index, best_score = i, score
+        return best_index
+
+    # @return: [float] best score of the result using its middle name
+    #          [float] minimum score needed for it to count as a match
+    def __score_middle_name(self, first_name, last_name, middle_name):
+        # if client has two names i.e. James Yates
+        if len(self.names) <= 2:
+            middle_name_score = max(similarity(self.first_name, middle_name), similarity(self.last_name, middle_name))
+            first_name_score = max(similarity(self.first_name, first_name), similarity(self.last_name, first_name))
+            last_name_score = max(similarity(self.first_name, last_name), similarity(self.last_name, last_name))
+            return max(first_name_score, last_name_score) + middle_name_score, min_result_score
+
+        # if client name has three names i.e. James Baxton Yates, check every combination
+        best_score = 0
+        for name in self.names:
+            remaining_names = self.names.copy()
+            remaining_names.remove(name)
+            first_name_score = similarity(first_name, name)
+            for i in range(2):
+                score = (first_name_score + similarity(middle_name, remaining_names[i % 2])
+                         + similarity(last_name, remaining_names[(i + 1) % 2]))
+                best_score = max(best_score, score)
+        return best_score, min_three_name_score
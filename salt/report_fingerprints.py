@@ -0,0 +1,93 @@
+from datetime import datetime
+import hashlib
+import sqlite3
+import json
+
+'''
+Remembers what's already been entered into HMIS for each location and date, so a SALT report
+that's re-exported after staff add late entries only has to go through the clients that are new
+or whose counts changed. A report that's identical to one that's already been run is skipped.
+'''
+class ReportFingerprints:
+    def __init__(self, filename, location, date):
+        self.location = location
+        self.date = date #MM-DD-YYYY
+
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS reports (
+                                       location TEXT, date TEXT, file_hash TEXT, processed_at TEXT,
+                                       PRIMARY KEY (location, date, file_hash))''')
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS clients (
+                                       location TEXT, date TEXT, client_key TEXT, fingerprint TEXT,
+                                       services TEXT, processed_at TEXT,
+                                       PRIMARY KEY (location, date, client_key))''')
+        self.connection.commit()
+
+    # @param: [str] file_hash: hash of the contents of a report, see 'hash_file'
+    # @return: [bool] true if the exact same report has already been run
+    def file_processed(self, file_hash):
+        cursor = self.connection.execute('SELECT 1 FROM reports WHERE location = ? AND date = ? AND file_hash = ?',
+                                         (self.location, self.date, file_hash))
+        return cursor.fetchone() is not None
+
+    def mark_file_processed(self, file_hash):
+        self.connection.execute('INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?)',
+                                (self.location, self.date, file_hash, self.__now()))
+        self.connection.commit()
+
+    # Compares the services of a client with what was entered for them the last time the report was run
+    # @param: [str] client_key: unique key of the client i.e. their HMIS ID
+    #         [dict] services: services in the current report
+    # @return: [str] 'new', 'unchanged' or 'changed'
+    #          [dict] services that still have to be entered, only the increase for changed clients
+    def get_delta(self, client_key, services):
+        cursor = self.connection.execute('''SELECT fingerprint, services FROM clients
+                                            WHERE location = ? AND date = ? AND client_key = ?''',
+                                         (self.location, self.date, client_key))
+        found = cursor.fetchone()
+        if found is None:
+            return 'new', services
+
+        fingerprint, processed_services = found
+        if fingerprint == self.__fingerprint(services):
+            return 'unchanged', {}
+
+        processed_services = json.loads(processed_services)
+        delta = {}
+        for service, count in services.items():
+            difference = count - processed_services.get(service, 0)
+            if difference > 0:
+                delta[service] = difference
+        for service, count in processed_services.items():
+            if services.get(service, 0) < count:
+                print("WARNING: " + service + " went down from " + str(count) + " to " + str(services.get(service, 0))
+                      + " for " + client_key + ", this has to be fixed in HMIS manually")
+        return 'changed', delta
+
+    # Stores the services of a client once they've been entered successfully
+    # @param: [str] client_key: unique key of the client i.e. their HMIS ID
+    #         [dict] services: all services of the client in the current report, not just the delta
+    def record_client(self, client_key, services):
+        self.connection.execute('INSERT OR REPLACE INTO clients VALUES (?, ?, ?, ?, ?, ?)',
+                                (self.location, self.date, client_key, self.__fingerprint(services),
+                                 json.dumps(services), self.__now()))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __fingerprint(self, services):
+        return hashlib.sha1(json.dumps(services, sort_keys=True).encode()).hexdigest()
+
+    def __now(self):
+        return datetime.now().isoformat(timespec='seconds')
+
+# Hashes the contents of a report, so that re-downloads of the exact same report can be recognized
+# @param: [str] filename: path of the report
+# @return: [str] hex digest of the file
+def hash_file(filename):
+    file_hash = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
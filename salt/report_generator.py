@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+import item_catalog
+import openpyxl
+import pandas as pd
+import random
+import csv
+import os
+
+'''
+Generates fake 'Report_by_client' reports in the same format as the ones downloaded from the
+SALT Web App, using the item codes of each location in item_catalog.py. Used for benchmarking
+and for trying out changes without a real report with client data in it.
+'''
+class ReportGenerator:
+    columns = ['', 'DoB', 'Client Name', 'HMIS ID', 'Race', 'Ethnicity', 'Verification of homeless',
+               'Gross monthly income', 'Service', 'Items']
+
+    first_names = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+                   'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas',
+                   'Sarah', 'Carlos', 'Maria', 'Luis', 'Ana', 'Jose', 'Rosa', 'Edward', 'Dorothy']
+    last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+                  'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor',
+                  'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Powell']
+    nicknames = ['Bo', 'Red', 'Slim', 'Tex', 'Doc', 'Junior']
+    races = ['White', 'Black, African American, or African', 'Asian or Asian American', 'Multi-Racial',
+             'Client refused']
+    ethnicities = ['Hispanic/Latina/e/o', 'Non-Hispanic/Non-Latina/e/o', 'Client refused']
+
+    def __init__(self, location, rows, seed=0):
+        self.location = location if location else "ORL"
+        self.rows = rows
+        self.random = random.Random(seed)
+
+        catalog = item_catalog.catalogs[self.location]
+        self.service_codes = catalog['services']
+        self.item_codes = [code for codes in catalog['items'].values() for code in codes]
+
+        # about one in ten clients checks in more than once in a day
+        self.clients = [self.__make_client(i) for i in range(max(1, int(rows * 0.9)))]
+
+    # Writes the report, the format is picked by extension (.xlsx, .csv or .parquet)
+    # @param: [str] output_path: folder the report is written to
+    #         [str] report_date: date of the report in format MM-DD-YYYY
+    #         [str] extension: file extension of the report
+    # @return: [str] path of the report
+    def write(self, output_path, report_date, extension=".xlsx"):
+        filename = os.path.join(output_path, "Report_by_client_" + report_date + extension)
+        if extension == ".xlsx":
+            # write-only mode streams rows to disk, so memory doesn't grow with the size of the report
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(self.columns)
+            for row in self.iter_rows():
+                sheet.append(row)
+            workbook.save(filename)
+        elif extension == ".csv":
+            with open(filename, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(self.iter_rows())
+        elif extension == ".parquet":
+            pd.DataFrame(list(self.iter_rows()), columns=self.columns).to_parquet(filename, index=False)
+        else:
+            raise ValueError("Unsupported report format: " + extension)
+        return filename
+
+    # @return: [generator] rows of the report, in the same order as 'columns'
+    def iter_rows(self):
+        for i in range(self.rows):
+            # the first clients get every repeat check-in, the rest come once
+            client = self.clients[i % len(self.clients)]
+            services, items = self.__make_visit()
+            yield [i + 1, client['DoB'], client['Client Name'], client['HMIS ID'], client['Race'],
+                   client['Ethnicity'], self.random.choice(['Yes', 'No', None]),
+                   self.random.choice([0, 0, 0, 200, 750, 1200]), services, items]
+
+    def __make_client(self, i):
+        first_name = self.random.choice(self.first_names)
+        last_name = self.random.choice(self.last_names)
+        # some names have a middle name or a nickname in quotes
+        chance = self.random.random()
+        if chance < 0.1:
+            last_name = last_name + ' "' + self.random.choice(self.nicknames) + '"'
+        elif chance < 0.2:
+            last_name = last_name + " " + self.random.choice(self.first_names)
+
+        # SALT exports birthdays as DD-MM-YYYY, a few clients don't have one
+        birthday = date(1950, 1, 1) + timedelta(days=self.random.randrange(0, 365 * 55))
+        dob = birthday.strftime('%d-%m-%Y') if self.random.random() > 0.02 else None
+        # about a fifth of clients don't have an HMIS ID yet
+        hmis_id = str(100000 + i) if self.random.random() > 0.2 else None
+
+        return {'DoB': dob,
+                'Client Name': last_name + " " + first_name,
+                'HMIS ID': hmis_id,
+                'Race': self.random.choice(self.races),
+                'Ethnicity': self.random.choice(self.ethnicities)}
+
+    # @return: [str] 'Service' column i.e. 'Shower: 1, Laundry: 1'
+    #          [str] 'Items' column i.e. 'TOP: 1, SKS: 2'
+    def __make_visit(self):
+        services = [code + ": 1" for code in self.service_codes if self.random.random() < 0.4]
+        items = [code + ": " + str(self.__make_count())
+                 for code in self.random.sample(self.item_codes, self.random.randint(0, 6))]
+        return (", ".join(services) if services else None), (", ".join(items) if items else None)
+
+    def __make_count(self):
+        # mostly single items, with the odd bulk handout to catch multi-digit counts
+        return self.random.choice([1, 1, 1, 2, 2, 3, 4, 12])
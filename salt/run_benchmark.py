@@ -0,0 +1,35 @@
+import argparse
+import benchmark
+import json
+import sys
+
+# Command Line Arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("-l", "--location", help="For specifying a location other than Downtown Orlando")
+parser.add_argument("-s", "--sizes", default="100,1000,10000", help="Comma separated report sizes in rows")
+parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of runs per size, the fastest is kept")
+parser.add_argument("-e", "--extension", default=".xlsx", help="Report format: .xlsx, .csv or .parquet")
+parser.add_argument("-sv", "--save", help="Save the results to a JSON file to be used as a baseline later")
+parser.add_argument("-b", "--baseline", help="JSON file of earlier results to compare against")
+parser.add_argument("-t", "--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline, i.e. 0.25 = 25%%")
+
+args = parser.parse_args()
+sizes = [int(size) for size in args.sizes.split(",")]
+
+bench = benchmark.Benchmark(args.location, sizes, args.repeat, args.extension)
+results = bench.run()
+
+if args.save:
+    with open(args.save, 'w') as f:
+        json.dump(results, f, indent=4)
+
+if args.baseline:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = benchmark.find_regressions(results, baseline, args.tolerance)
+    if regressions:
+        print("REGRESSION: the following stages are slower than the baseline")
+        for regression in regressions:
+            print(regression)
+        sys.exit(1)
+    print("No regressions against the baseline")
@@ -0,0 +1,98 @@
+import argparse
+import statistics
+import time
+import hmis_driver
+import salt_driver
+import session_lifecycle
+
+'''
+Compares the lean browser profile of hmis_driver.py and salt_driver.py with a browser started
+with the default settings: how long the browser takes to start, how long each page takes before
+it's handed back to the automation and before it's completely loaded, how much is downloaded
+for it and how much memory the browser ends up using. Only public pages (i.e. the login pages)
+are loaded, so no login is needed.
+'''
+drivers = {'hmis': hmis_driver.Driver, 'salt': salt_driver.Driver}
+default_urls = {'hmis': ['https://clienttrack.eccovia.com/login/HSNCFL'],
+                'salt': ['https://saltoutreachapp.com/']}
+
+# everything the page downloaded, read once the page is completely loaded
+performance_script = """
+    var navigation = performance.getEntriesByType('navigation')[0];
+    var resources = performance.getEntriesByType('resource');
+    return {
+        load: navigation ? navigation.loadEventEnd : null,
+        bytes: (navigation ? navigation.transferSize : 0) + resources.reduce((total, resource) => total + resource.transferSize, 0),
+        requests: resources.length
+    };
+"""
+
+# Loads every page with one browser
+# @param: [str] browser: 'hmis' or 'salt'
+#         [bool] lean: whether the browser uses the lean profile
+#         [list] urls: pages to be loaded
+#         [int] repeat: number of times each page is loaded
+# @return: [dict] averages of the start up time, the time until the page was handed back, the time until it was
+#                 completely loaded, the bytes and requests of each page, and the memory of the browser at the end
+def measure(browser, lean, urls, repeat):
+    start_time = time.perf_counter()
+    driver = drivers[browser](lean=lean)
+    startup = time.perf_counter() - start_time
+
+    handed_back, loads, downloads, requests = [], [], [], []
+    try:
+        for url in urls:
+            for i in range(repeat):
+                start_time = time.perf_counter()
+                driver.browser.get(url)
+                handed_back.append(time.perf_counter() - start_time)
+                # eager pages are handed back before they're done, wait for the rest so both are measured the same way
+                while driver.browser.execute_script('return document.readyState') != 'complete':
+                    time.sleep(0.05)
+                performance = driver.browser.execute_script(performance_script)
+                if performance['load']:
+                    loads.append(performance['load'] / 1000)
+                downloads.append(performance['bytes'])
+                requests.append(performance['requests'])
+        memory = session_lifecycle.browser_memory(driver)
+    finally:
+        driver.browser.quit()
+
+    return {'startup': startup,
+            'handed_back': statistics.mean(handed_back),
+            'load': statistics.mean(loads) if loads else None,
+            'bytes': statistics.mean(downloads),
+            'requests': statistics.mean(requests),
+            'memory': memory}
+
+def print_result(name, result):
+    print("%s: started in %.2fs, page handed back after %.0f ms, loaded after %s, %.0f KB in %.0f requests, %s of memory"
+          % (name, result['startup'], result['handed_back'] * 1000,
+             "%.0f ms" % (result['load'] * 1000) if result['load'] is not None else "n/a",
+             result['bytes'] / 1024, result['requests'],
+             "%.0f MB" % result['memory'] if result['memory'] is not None else "n/a (needs psutil)"))
+
+def print_difference(default, lean):
+    def change(name):
+        if default[name] is None or lean[name] is None or not default[name]:
+            return "n/a"
+        return "%+.0f%%" % ((lean[name] - default[name]) / default[name] * 100)
+    print("lean vs default: start up %s, handed back %s, loaded %s, downloaded %s, requests %s, memory %s"
+          % (change('startup'), change('handed_back'), change('load'), change('bytes'), change('requests'), change('memory')))
+
+# Command Line Arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", "--browser", default="hmis", choices=["hmis", "salt", "both"],
+                    help="Browser to benchmark, Chrome for HMIS or Firefox for SALT")
+parser.add_argument("-u", "--url", action='append', help="Page to load, can be given more than once")
+parser.add_argument("-n", "--repeat", type=int, default=5, help="Number of times each page is loaded")
+
+args = parser.parse_args()
+browsers = ['hmis', 'salt'] if args.browser == "both" else [args.browser]
+for browser in browsers:
+    urls = args.url if args.url else default_urls[browser]
+    default = measure(browser, False, urls, args.repeat)
+    lean = measure(browser, True, urls, args.repeat)
+    print_result(browser + " default", default)
+    print_result(browser + " lean", lean)
+    print_difference(default, lean)
@@ -1,31 +1,46 @@
 import argparse
 import daily_data
+import batch_data
 import datetime
 import warnings
 
-# Command Line Arguments
-parser = argparse.ArgumentParser()
-parser.add_argument("-f", "--filename", help="Filename")
-parser.add_argument("-o", "--output", action='store_true')
-parser.add_argument("-a", "--automate", action='store_true') # Outputs a spreadsheet of unprocessed / dirty entries that can not be entered automatically
-parser.add_argument("-m", "--manual", action='store_true') # Outputs a readable spreadsheet for data to be entered manually
-parser.add_argument("-l", "--location", help="For specifying a location other than Downtown Orlando")
-parser.add_argument("-li", "--listitems", action='store_true', help="List Unique Items")
+# guard is needed for '-d', the process pool re-imports this file in every worker process
+if __name__ == "__main__":
+    # Command Line Arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-f", "--filename", help="Filename")
+    parser.add_argument("-o", "--output", action='store_true')
+    parser.add_argument("-a", "--automate", action='store_true') # Outputs a spreadsheet of unprocessed / dirty entries that can not be entered automatically
+    parser.add_argument("-m", "--manual", action='store_true') # Outputs a readable spreadsheet for data to be entered manually
+    parser.add_argument("-l", "--location", help="For specifying a location other than Downtown Orlando")
+    parser.add_argument("-li", "--listitems", action='store_true', help="List Unique Items")
+    parser.add_argument("-w", "--worklist", action='store_true') # Outputs a JSON list of the clients to be automated
+    parser.add_argument("-d", "--directory", help="Folder or glob of reports to be processed at once")
+    parser.add_argument("-p", "--processes", type=int, help="Number of reports to process at the same time with '-d'")
+    parser.add_argument("-s", "--sessions", type=int, default=1, help="Number of HMIS sessions entering clients at the same time with '-a'")
 
-args = parser.parse_args()
-if not args.filename:
-       print("ERROR: Please add a file to read by typing '-f' before your filename")
-       quit()
+    args = parser.parse_args()
+    if not args.filename and not args.directory:
+           print("ERROR: Please add a file to read by typing '-f' before your filename")
+           quit()
+    if args.directory and args.automate:
+           print("ERROR: Automation can only be run on one file at a time, please use '-f' instead of '-d'")
+           quit()
 
-start_time = datetime.datetime.now()
+    start_time = datetime.datetime.now()
 
-dd = daily_data.DailyData(args.filename, args.automate, args.manual, args.output, args.location, args.listitems)
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    dd.read_and_process_data()
+    if args.directory:
+        batch = batch_data.BatchData(args.directory, args.output, args.location, args.listitems, args.processes)
+        batch.read_and_process_data()
+    else:
+        dd = daily_data.DailyData(args.filename, args.automate, args.manual, args.output, args.location, args.listitems,
+                                  args.worklist, args.sessions)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            dd.read_and_process_data()
 
-end_time = datetime.datetime.now()
-difference = end_time - start_time
-diff_in_seconds = difference.total_seconds()
-diff_in_minutes = divmod(diff_in_seconds, 60)[0]
-print("Total Automation Time: " + str(diff_in_minutes) + " minutes")
\ No newline at end of file
+    end_time = datetime.datetime.now()
+    difference = end_time - start_time
+    diff_in_seconds = difference.total_seconds()
+    diff_in_minutes = divmod(diff_in_seconds, 60)[0]
+    print("Total Automation Time: " + str(diff_in_minutes) + " minutes")
\ No newline at end of file
@@ -0,0 +1,140 @@
+import argparse
+import difflib
+import random
+import time
+import name_matcher
+import report_generator
+
+'''
+Compares name_matcher.py with the difflib scoring hmis_driver.py used to do: how often each one
+makes the right call on a set of hand labeled names, how often they agree with each other,
+and how long each one takes to pick a client out of a list of search results.
+'''
+# (SALT first name, SALT last name), (HMIS first name, HMIS last name), same client
+labeled_dashboards = [
+    (("James", "Powell"), ("James", "Powell"), True),
+    (("Jim", "Powell"), ("James", "Powell"), True),
+    (("Powell", "James"), ("James", "Powell"), True),
+    (("Jonh", "Smiht"), ("John", "Smith"), True),
+    (("Edward", "Powell James"), ("Edward", "Powell"), True),
+    (("Robert", "O'Neil"), ("Robert", "ONeil"), True),
+    (("Ana", "Lopez Garcia"), ("Ana", "Lopez-Garcia"), True),
+    (("Patricia", "White"), ("Patricia \"Pat\"", "White"), True),
+    (("Maria", "Garcia"), ("Jose", "Hernandez"), False),
+    (("Ana", "Lee"), ("Bob", "Kim"), False),
+    (("Luis", "Perez"), ("Dorothy", "Thompson"), False),
+]
+
+# (SALT first name, SALT last name), HMIS search results (first, last, middle), index of the right result
+labeled_results = [
+    (("James", "Powell"), [("Mary", "Powell", ""), ("James", "Powell", "")], 1),
+    (("James", "Yates"), [("James", "Smith", "Yates")], 0),
+    (("James", "Baxton Yates"), [("James", "Yates", "Baxton")], 0),
+    (("Carlos", "Martinez"), [("Luis", "Martin", ""), ("Carla", "Martinez", "")], 1),
+    (("Rosa", "Lopez"), [("Maria", "Gonzalez", "")], None),
+    (("Smith", "John"), [("John", "Smith", "")], 0),
+    (("Patricia", "White"), [("Patricia \"Pat\"", "White", "")], 0),
+    (("Ana", "Lopez Garcia"), [("Ana", "Lopez-Garcia", "")], 0),
+    (("Dorothy", "Harris"), [("Dorothy", "Harrison", ""), ("Dorothy", "Harris", "")], 1),
+    (("Michael", "Brown"), [("Michelle", "Brown", ""), ("Michael", "Browne", "")], 1),
+    (("Thomas", "Anderson"), [("Tom", "Anderson", "")], 0),
+    (("Joseph", "Taylor"), [("Jessica", "Moore", "")], None),
+    (("John", "Doe Smith"), [("Jane", "Roe", "Smythe")], None),
+    (("Linda", "O'Connor"), [("Linda", "OConnor", ""), ("Lena", "Connor", "")], 0),
+    (("Sarah", "Jackson"), [("Jackson", "Sarah", "")], 0),
+]
+
+# The scoring hmis_driver.py used before name_matcher.py, kept to compare against
+def difflib_similar(a, b):
+    return difflib.SequenceMatcher(a=a.lower(), b=b.lower()).ratio()
+
+def difflib_matches(first_name, last_name, dashboard_first_name, dashboard_last_name):
+    return (difflib_similar(dashboard_first_name, first_name) + difflib_similar(dashboard_last_name, last_name) >= 0.80
+            or difflib_similar(dashboard_first_name, last_name) + difflib_similar(dashboard_last_name, first_name) >= 0.80)
+
+def difflib_best_result(first_name, last_name, results):
+    best_index, best_score = None, 0
+    for i, (result_first_name, result_last_name, result_mid_name) in enumerate(results):
+        for score in (difflib_similar(result_first_name, first_name) + difflib_similar(result_last_name, last_name),
+                      difflib_similar(result_first_name, last_name) + difflib_similar(result_last_name, first_name)):
+            if score >= 1.4 and score > best_score:
+                best_index, best_score = i, score
+    if best_index is not None:
+        return best_index
+
+    names = last_name.split(" ", 1) + [first_name]
+    for i, (result_first_name, result_last_name, result_mid_name) in enumerate(results):
+        if len(names) <= 2:
+            mid_name_score = max(difflib_similar(first_name, result_mid_name), difflib_similar(last_name, result_mid_name))
+            first_name_score = max(difflib_similar(first_name, result_first_name), difflib_similar(last_name, result_first_name))
+            last_name_score = max(difflib_similar(first_name, result_last_name), difflib_similar(last_name, result_last_name))
+            score = max(first_name_score + mid_name_score, last_name_score + mid_name_score)
+            if score >= 1.4 and score > best_score:
+                best_index, best_score = i, score
+        else:
+            for name in names:
+                remaining_names = names.copy()
+                remaining_names.remove(name)
+                first_name_score = difflib_similar(result_first_name, name)
+                for j in range(2):
+                    score = (first_name_score + difflib_similar(result_mid_name, remaining_names[j % 2])
+                             + difflib_similar(result_last_name, remaining_names[(j + 1) % 2]))
+                    if score >= 2 and score > best_score:
+                        best_index, best_score = i, score
+    return best_index
+
+def name_matcher_matches(first_name, last_name, dashboard_first_name, dashboard_last_name):
+    return name_matcher.NameMatcher(first_name, last_name).matches(dashboard_first_name, dashboard_last_name)
+
+def name_matcher_best_result(first_name, last_name, results):
+    return name_matcher.NameMatcher(first_name, last_name).best_result(results)
+
+def check_agreement():
+    scorers = {'difflib': (difflib_matches, difflib_best_result),
+               'name_matcher': (name_matcher_matches, name_matcher_best_result)}
+    decisions = {}
+    for scorer, (matches, best_result) in scorers.items():
+        decisions[scorer] = ([matches(*client, *dashboard) for client, dashboard, expected in labeled_dashboards]
+                             + [best_result(*client, results) for client, results, expected in labeled_results])
+
+    expected = ([expected for client, dashboard, expected in labeled_dashboards]
+                + [expected for client, results, expected in labeled_results])
+    for scorer, decision in decisions.items():
+        correct = sum(1 for a, b in zip(decision, expected) if a == b)
+        print("%s: %d of %d labeled names right" % (scorer, correct, len(expected)))
+
+    agreed = sum(1 for a, b in zip(decisions['difflib'], decisions['name_matcher']) if a == b)
+    print("difflib and name_matcher agree on %d of %d labeled names" % (agreed, len(expected)))
+    labels = ([(client, dashboard) for client, dashboard, expected in labeled_dashboards]
+              + [(client, results) for client, results, expected in labeled_results])
+    for label, a, b, right in zip(labels, decisions['difflib'], decisions['name_matcher'], expected):
+        if a != b:
+            print("  disagree on %s: difflib %s, name_matcher %s, expected %s" % (label, a, b, right))
+    return agreed == len(expected)
+
+def time_search_results(clients, rows, seed):
+    generator = report_generator.ReportGenerator
+    rand = random.Random(seed)
+    def make_name():
+        return rand.choice(generator.first_names), rand.choice(generator.last_names)
+    searches = [(make_name(), [make_name() + (rand.choice(generator.first_names + [""] * 3),) for j in range(rows)])
+                for i in range(clients)]
+
+    for scorer, best_result in (('difflib', difflib_best_result), ('name_matcher', name_matcher_best_result)):
+        start_time = time.perf_counter()
+        for (first_name, last_name), results in searches:
+            best_result(first_name, last_name, results)
+        seconds = time.perf_counter() - start_time
+        print("%s: %d clients against %d results each in %.1f ms (%.0f clients/s)"
+              % (scorer, clients, rows, seconds * 1000, clients / max(seconds, 1e-9)))
+
+# Command Line Arguments, only when run as a script so the labeled names can be checked by the tests
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--clients", type=int, default=2000, help="Number of clients to search for")
+    parser.add_argument("-n", "--rows", type=int, default=20, help="Number of search results for each client")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    check_agreement()
+    time_search_results(args.clients, args.rows, args.seed)
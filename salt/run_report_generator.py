@@ -0,0 +1,17 @@
+import argparse
+import report_generator
+
+# Command Line Arguments
+parser = argparse.ArgumentParser()
+parser.add_argument("-l", "--location", help="For specifying a location other than Downtown Orlando")
+parser.add_argument("-n", "--rows", type=int, default=100, help="Number of rows in the report")
+parser.add_argument("-d", "--date", default="01-01-2024", help="Date of the report in format MM-DD-YYYY")
+parser.add_argument("-o", "--output", default=".", help="Folder the report is written to")
+parser.add_argument("-e", "--extension", default=".xlsx", help="Report format: .xlsx, .csv or .parquet")
+parser.add_argument("-s", "--seed", type=int, default=0)
+
+args = parser.parse_args()
+
+generator = report_generator.ReportGenerator(args.location, args.rows, args.seed)
+filename = generator.write(args.output, args.date, args.extension)
+print("Report written to " + filename)
@@ -4,20 +4,30 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium import webdriver
-from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import wait_timeouts
+import driver_binaries
 import traceback
 import time
 
 class Driver:
 
     # Global Variables
-    wait_time = 3
+    wait_time = 3 # starting timeout of every wait, see 'wait_timeouts.py'
+    # start the browser without images, web fonts or anything else the automation never reads,
+    #   see '__lean_options'
+    lean_browser = True
+    disk_cache_size = 50 * 1024 # KB
+
+    # @param: [WaitTimeouts] timeouts: timeouts learned from earlier runs
+    #         [bool] lean: start the browser with the lean profile, defaults to 'lean_browser'
+    def __init__(self, timeouts=None, lean=None):
+        self.timeouts = timeouts if timeouts else wait_timeouts.WaitTimeouts(default=self.wait_time)
 
-    def __init__(self):
         desired = DesiredCapabilities.FIREFOX
         
         firefox_options = Options()
@@ -26,7 +36,11 @@ class Driver:
         # added for linux build
         firefox_options.add_argument("--headless")
 
-        self.browser = webdriver.Firefox(options=firefox_options, service=FirefoxService(GeckoDriverManager().install()))
+        self.lean = self.lean_browser if lean is None else lean
+        if self.lean:
+            self.__lean_options(firefox_options)
+
+        self.browser = webdriver.Firefox(options=firefox_options, service=FirefoxService(driver_binaries.geckodriver_path()))
 
     def open_saltwebapp(self, location):
         if location == "ORL": 
@@ -36,7 +50,7 @@ class Driver:
 
     def login_saltwebapp_native(self, username, password):
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Login: Email',
                 EC.element_to_be_clickable((By.XPATH, '//input[@type="email"]'))
             )
             field_username = self.browser.find_element(By.XPATH, '//input[@type="email"]')
@@ -55,7 +69,7 @@ class Driver:
         self.__wait_until_page_fully_loaded('SALT Homepage')
         time.sleep(10)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('SALT Homepage: Navbar',
                 EC.visibility_of_element_located((By.ID, 'navbar'))
             )
         except Exception as e:
@@ -67,7 +81,7 @@ class Driver:
 
     def login_saltwebapp_google(self, username, password):
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Login: Google Login',
                 EC.element_to_be_clickable((By.XPATH, '//div[@class="text-center"]/a'))
             )
             button_google_login = self.browser.find_element(By.XPATH, '//div[@class="text-center"]/a')
@@ -78,7 +92,7 @@ class Driver:
             return False
  
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Google: Username',
                 EC.presence_of_element_located((By.ID, 'identifierId'))
             )
             field_username = self.browser.find_element(By.ID, 'identifierId')
@@ -90,7 +104,7 @@ class Driver:
             return False
 
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('Google: Password',
                 EC.element_to_be_clickable((By.XPATH, '//input[@type="password"]'))
             )
             field_password = self.browser.find_element(By.XPATH, '//input[@type="password"]')
@@ -106,7 +120,7 @@ class Driver:
         self.__wait_until_page_fully_loaded('SALT Homepage')
         time.sleep(3)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('SALT Homepage: Navbar',
                 EC.visibility_of_element_located((By.ID, 'navbar'))
             )
         except Exception as e:
@@ -119,7 +133,7 @@ class Driver:
     def navigate_to_daily_data_by_client(self, date):
         self.__wait_until_page_fully_loaded('SALT Homepage')
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('SALT Homepage: Date',
                 EC.element_to_be_clickable((By.ID, 'formdate'))
             )
             input_date = self.browser.find_element(By.ID, 'formdate')
@@ -140,7 +154,7 @@ class Driver:
             download_url = "https://sanford.saltoutreachapp.com/dashboard/export"
             time.sleep(3)
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait('SALT Homepage: Export',
                 EC.element_to_be_clickable((By.XPATH, '//form[@action="{}"]/button'.format(download_url)))
             )
             button_export = self.browser.find_element(By.XPATH, '//form[@action="{}"]/button'.format(download_url))
@@ -157,11 +171,54 @@ class Driver:
     '''
     ------------------------ HELPER ------------------------
     '''
+    # Leaves out everything the SALT Web App doesn't need to be automated: images, web fonts, add-ons,
+    #   hardware acceleration and Firefox's own background requests. Pages are handed back as soon as
+    #   they're parsed instead of once every image has loaded, every step already waits for what it needs
+    # @param: [Options] firefox_options: options the browser is started with
+    def __lean_options(self, firefox_options):
+        firefox_options.page_load_strategy = 'eager'
+        preferences = {"permissions.default.image": 2,
+                       "browser.display.use_document_fonts": 0,
+                       "gfx.downloadable_fonts.enabled": False,
+                       "extensions.enabledScopes": 0,
+                       "xpinstall.enabled": False,
+                       "layers.acceleration.disabled": True,
+                       "webgl.disabled": True,
+                       "media.autoplay.default": 5,
+                       "network.prefetch-next": False,
+                       "network.dns.disablePrefetch": True,
+                       "network.http.speculative-parallel-limit": 0,
+                       "browser.safebrowsing.malware.enabled": False,
+                       "browser.safebrowsing.phishing.enabled": False,
+                       "browser.safebrowsing.downloads.enabled": False,
+                       "app.update.enabled": False,
+                       "datareporting.policy.dataSubmissionEnabled": False,
+                       "toolkit.telemetry.enabled": False,
+                       "browser.cache.disk.smart_size.enabled": False,
+                       "browser.cache.disk.capacity": self.disk_cache_size}
+        for name, value in preferences.items():
+            firefox_options.set_preference(name, value)
+
+    # Waits for a condition with the timeout learned for the named wait, and records how long it took
+    # @param: [str] name: name of the wait i.e. the page or field being waited on
+    #         [function] condition: expected condition to wait for
+    # @return: the result of the condition
+    def __wait(self, name, condition):
+        timeout = self.timeouts.get(name)
+        start_time = time.perf_counter()
+        try:
+            result = WebDriverWait(self.browser, timeout).until(condition)
+        except TimeoutException as e:
+            self.timeouts.record(name, timeout, timed_out=True)
+            raise
+        self.timeouts.record(name, time.perf_counter() - start_time)
+        return result
+
     # Waits until a page is fully loaded before continuing
     # @param: [str] page_name: the name of the page to be printed in output to make debug easier
     def __wait_until_page_fully_loaded(self, page_name):
         try:
-            WebDriverWait(self.browser, self.wait_time).until(
+            self.__wait(page_name,
                 lambda browser: browser.execute_script('return document.readyState') == 'complete')
         except Exception as e:
             print("Error loading " + page_name + " page")
@@ -0,0 +1,66 @@
+from datetime import datetime
+import sqlite3
+import threading
+
+'''
+Records every service the moment it's saved in HMIS, for each location, date and client. When
+a client fails partway through their services, or a report is run again by hand or by the retries
+in run_scheduled_automation.py, only the services that are still missing are entered instead of
+entering all of them again and leaving duplicates in HMIS.
+'''
+class ServiceLedger:
+    # @param: [str] filename: SQLite database the ledger is kept in
+    #         [str] location: location code i.e. ORL
+    #         [str] date: date of service in format MM-DD-YYYY
+    def __init__(self, filename, location, date):
+        self.location = location
+        self.date = date #MM-DD-YYYY
+
+        # services are recorded from the thread of the HMIS session that saved them
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS services (
+                                       location TEXT, date TEXT, client_key TEXT, service TEXT,
+                                       units INTEGER, saved_at TEXT)''')
+        self.connection.execute('''CREATE INDEX IF NOT EXISTS services_by_client
+                                       ON services (location, date, client_key)''')
+        self.connection.commit()
+
+    # Records a service right after it's been saved in HMIS
+    # @param: [str] client_key: unique key of the client i.e. their HMIS ID, see 'report_fingerprints.py'
+    #         [str] service: service that was saved i.e. Shower
+    #         [int] units: units that were saved
+    def record(self, client_key, service, units):
+        with self.lock:
+            self.connection.execute('INSERT INTO services VALUES (?, ?, ?, ?, ?, ?)',
+                                    (self.location, self.date, client_key, service, int(units),
+                                     datetime.now().isoformat(timespec='seconds')))
+            self.connection.commit()
+
+    # @param: [str] client_key: unique key of the client i.e. their HMIS ID
+    # @return: [dict] total units of each service saved for the client on this date
+    def saved_services(self, client_key):
+        with self.lock:
+            rows = self.connection.execute('''SELECT service, SUM(units) FROM services
+                                              WHERE location = ? AND date = ? AND client_key = ? GROUP BY service''',
+                                           (self.location, self.date, client_key)).fetchall()
+        return dict(rows)
+
+    # Works out which services still have to be entered for a client
+    # @param: [str] client_key: unique key of the client i.e. their HMIS ID
+    #         [dict] services: services left to be entered, i.e. the increase for a changed client
+    #         [dict] all_services: every service the client got on this date
+    # @return: [dict] services that haven't been saved yet
+    def get_missing(self, client_key, services, all_services):
+        saved = self.saved_services(client_key)
+        missing = {}
+        for service, count in services.items():
+            # never more than what's left to reach the total, in case part of it was saved by an earlier try
+            count = min(count, all_services.get(service, count) - saved.get(service, 0))
+            if count > 0:
+                missing[service] = count
+        return missing
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,82 @@
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+'''
+Keeps track of how long a single HMIS session has been running, so its browser can be restarted
+before it gets too slow or too big. Headless Chrome grows and slows down over a run that takes
+hours, so the browser is restarted after a number of clients, once it uses too much memory or
+once clients take a lot longer than they did when the browser was fresh.
+
+Memory is only checked when psutil is installed, the other limits work without it.
+'''
+class SessionLifecycle:
+    # clients a browser enters before it's restarted
+    max_clients = 200
+    # memory of the browser and all of its processes, in MB
+    max_memory = 1500
+    # restart once the latest clients take this many times as long as the first ones
+    max_slowdown = 2
+    # number of clients averaged to measure how long clients take
+    window = 10
+
+    def __init__(self):
+        self.recycles = 0
+        # seconds per client before the last restart, printed once the new browser has been measured
+        self.latency_before = None
+        self.__start()
+
+    # Records how long a client took
+    # @param: [float] seconds: time taken to enter the client
+    def record(self, seconds):
+        self.clients += 1
+        self.latencies.append(seconds)
+        del self.latencies[:-self.window]
+        if self.clients == self.window:
+            self.baseline = self.__average()
+
+    # Checks whether the browser should be restarted
+    # @param: [Driver] driver: the session's driver
+    # @return: [str] reason to restart the browser, None if it's fine
+    def check(self, driver):
+        if self.clients >= self.max_clients:
+            return "after " + str(self.clients) + " clients"
+        memory = browser_memory(driver)
+        if memory is not None and memory >= self.max_memory:
+            return "using " + str(int(memory)) + " MB"
+        if self.baseline and self.clients >= self.window * 2 and self.__average() >= self.baseline * self.max_slowdown:
+            return "taking " + str(round(self.__average(), 1)) + "s per client, up from " + str(round(self.baseline, 1)) + "s"
+        return None
+
+    # Starts counting again for a new browser
+    def recycled(self):
+        self.recycles += 1
+        self.latency_before = self.__average()
+        self.__start()
+
+    # @return: [float] average seconds per client of the latest clients, None before any clients
+    def latency(self):
+        return self.__average()
+
+    def __start(self):
+        self.clients = 0
+        self.latencies = []
+        self.baseline = None
+
+    def __average(self):
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+# Measures the memory of a browser and every process it started i.e. the renderers
+# @param: [Driver] driver: driver of the browser
+# @return: [float] resident memory in MB, None if it can't be measured
+def browser_memory(driver):
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.browser.service.process.pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True)) / (1024 * 1024)
+    except Exception as e:
+        return None
@@ -0,0 +1,177 @@
+import hmis_driver
+import session_lifecycle
+import threading
+import time
+import traceback
+
+'''
+Pool of HMIS Clienttrack sessions, each one its own headless browser logged in independently and
+running on its own thread. Every session takes clients off the same queue as soon as it's
+logged in, so the report is entered by all of them at once. Sessions are given the logins in 'settings.json' in turn, so
+one login can be shared by several sessions or each session can have its own.
+
+A session that fails only fails the client it was working on, and a session whose browser
+has crashed stops taking clients while the other sessions keep going. A session whose browser
+has gotten too slow or too big restarts it and logs back in, see 'session_lifecycle.py'.
+'''
+class SessionPool:
+    # @param: [list] credentials: (username, password) of every login that can be used
+    #         [int] size: number of sessions
+    #         [WaitTimeouts] timeouts: wait timeouts shared by every session
+    def __init__(self, credentials, size, timeouts=None):
+        self.credentials = credentials
+        self.size = size
+        self.timeouts = timeouts
+        self.drivers = []
+        self.lock = threading.Lock()
+        self.login_threads = []
+        self.recycles = 0
+        # notified every time a session finishes logging in, whether it worked or not
+        self.login_finished = threading.Condition(self.lock)
+        self.logins_finished = 0
+        self.closed = False
+
+    # Opens and logs into every session at the same time in the background
+    def start(self):
+        for number in range(self.size):
+            username, password = self.credentials[number % len(self.credentials)]
+            login_thread = threading.Thread(target=self.__open_session, args=(number, username, password))
+            login_thread.start()
+            self.login_threads.append(login_thread)
+
+    # Waits for the first session to log in, the others keep logging in in the background
+    # @return: [bool] true if a session logged in, false if every session failed to
+    def wait_until_ready(self):
+        with self.login_finished:
+            self.login_finished.wait_for(lambda: self.drivers or self.logins_finished == self.size)
+            return len(self.drivers) > 0
+
+    # Has every session work through the queue, each one starts as soon as it's logged in. The results of
+    #   each item are put in 'results_queue' as soon as they're ready, followed by None once the work queue is done
+    # @param: [Queue] work_queue: items to be worked on, ends with None
+    #         [function] task: called as task(driver, item) on the session's own thread, returns the result
+    #         [Queue] results_queue: queue of (item, result), the result is False for items a session failed on
+    def run(self, work_queue, task, results_queue):
+        workers = [threading.Thread(target=self.__work, args=(number, login_thread, work_queue, task, results_queue))
+                   for number, login_thread in enumerate(self.login_threads)]
+        for worker in workers:
+            worker.start()
+        threading.Thread(target=self.__finish, args=(workers, work_queue, results_queue), daemon=True).start()
+
+    # Closes the browser of every session
+    def close(self):
+        with self.lock:
+            self.closed = True
+            drivers, self.drivers = self.drivers, []
+        for number, driver in drivers:
+            driver.close()
+
+    def __open_session(self, number, username, password):
+        driver = None
+        try:
+            driver = hmis_driver.Driver(self.timeouts)
+            driver.open_clienttrack()
+            if driver.login_clienttrack(username, password):
+                self.__login_finished(number, driver)
+                return
+        except Exception as e:
+            print("Couldn't open HMIS Clienttrack for session " + str(number))
+            print(traceback.format_exc())
+        if driver:
+            driver.close()
+        self.__login_finished(number, None)
+
+    def __login_finished(self, number, driver):
+        with self.login_finished:
+            # the run ended before this session finished logging in
+            if driver and self.closed:
+                driver.close()
+            elif driver:
+                self.drivers.append((number, driver))
+            self.logins_finished += 1
+            if self.logins_finished == self.size and self.size > 1:
+                print(str(len(self.drivers)) + " of " + str(self.size) + " HMIS sessions logged in")
+            self.login_finished.notify_all()
+
+    def __work(self, number, login_thread, work_queue, task, results_queue):
+        login_thread.join()
+        with self.lock:
+            driver = next((driver for n, driver in self.drivers if n == number), None)
+        if not driver:
+            return
+        lifecycle = session_lifecycle.SessionLifecycle()
+        while True:
+            item = work_queue.get()
+            if item is None:
+                # put the end of the queue back so the other sessions stop too
+                work_queue.put(None)
+                return
+            start_time = time.perf_counter()
+            try:
+                result = task(driver, item)
+            except Exception as e:
+                print("Session " + str(number) + " failed on the current client")
+                print(traceback.format_exc())
+                result = False
+            results_queue.put((item, result))
+
+            if not self.__browser_alive(driver):
+                print("Session " + str(number) + " lost its browser, the other sessions will carry on")
+                return
+
+            # skipped clients never touch the browser
+            if result is not None:
+                lifecycle.record(time.perf_counter() - start_time)
+                if lifecycle.clients == lifecycle.window and lifecycle.latency_before:
+                    print("Session " + str(number) + " is taking " + str(round(lifecycle.latency(), 1))
+                          + "s per client since restarting its browser, " + str(round(lifecycle.latency_before, 1)) + "s before")
+                reason = lifecycle.check(driver)
+                if reason:
+                    driver = self.__recycle(number, driver, reason, lifecycle)
+                    if not driver:
+                        return
+
+    # Restarts the browser of a session and logs back in, so the session carries on with the next client
+    # @return: [Driver] the new driver, None if it couldn't log back in
+    def __recycle(self, number, driver, reason, lifecycle):
+        print("Session " + str(number) + " is restarting its browser, " + reason)
+        username, password = driver.credentials
+        driver.close()
+        lifecycle.recycled()
+        with self.lock:
+            self.recycles += 1
+        new_driver = None
+        try:
+            new_driver = hmis_driver.Driver(self.timeouts)
+            new_driver.open_clienttrack()
+            if new_driver.login_clienttrack(username, password):
+                # so 'close' closes the new browser instead of the old one
+                with self.lock:
+                    self.drivers = [(n, new_driver if n == number else d) for n, d in self.drivers]
+                return new_driver
+        except Exception as e:
+            print(traceback.format_exc())
+        if new_driver:
+            new_driver.close()
+        print("Session " + str(number) + " couldn't log back in after restarting, the other sessions will carry on")
+        return None
+
+    # Waits for every session to stop, fails anything left in the queue if every browser crashed
+    def __finish(self, workers, work_queue, results_queue):
+        for worker in workers:
+            worker.join()
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            results_queue.put((item, False))
+        if self.recycles:
+            print("Restarted HMIS browsers " + str(self.recycles) + " times")
+        results_queue.put(None)
+
+    def __browser_alive(self, driver):
+        try:
+            driver.browser.current_window_handle
+            return True
+        except Exception as e:
+            return False
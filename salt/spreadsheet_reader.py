@@ -0,0 +1,133 @@
+from itertools import islice
+import openpyxl
+import pandas as pd
+import numpy as np
+import os
+
+'''
+Loads the reports downloaded from SALT and HMIS into a dataframe without building the whole
+workbook in memory. The reader is picked by file extension: CSV and Parquet go straight to
+pandas (Parquet needs pyarrow), Excel workbooks are read with the calamine engine when it's
+installed, otherwise streamed row by row with openpyxl in read-only mode. The rows come out the
+same as with pd.read_excel: blank rows are kept unless they're at the end of the sheet.
+
+'read_spreadsheet' still puts every chunk together into one dataframe at the end, so memory grows
+with the number of rows in the report, it's only the workbook that isn't loaded. DailyData and
+DateOfEngagement need the whole report at once, to merge the rows of each client and to write
+the failed entries back out in their original format. Use 'iter_spreadsheet' to go through a
+report a chunk at a time with flat memory.
+'''
+chunk_size = 10000
+
+# Reads a report into a single dataframe
+# @param: [str] filename: path of the .xlsx, .csv or .parquet file to be read
+#         [dict] dtype: column names mapped to the data type they should be read as
+# @return: [DataFrame] contents of the first sheet of the report
+def read_spreadsheet(filename, dtype):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(filename, dtype=dtype)
+    if extension == ".parquet":
+        df = pd.read_parquet(filename)
+        return df.astype({column: kind for column, kind in dtype.items() if column in df.columns})
+    if extension not in (".xlsx", ".xlsm"):
+        # i.e. old .xls files, which openpyxl can't read
+        return pd.read_excel(io=filename, dtype=dtype)
+
+    if _calamine_installed():
+        return pd.read_excel(io=filename, dtype=dtype, engine="calamine")
+
+    try:
+        chunks = list(iter_spreadsheet(filename, dtype))
+    except _RowWiderThanHeader as e:
+        # pandas adds a column for the cells without a header, which isn't known until the whole sheet is read
+        print(str(e) + ", reading the whole workbook instead")
+        return pd.read_excel(io=filename, dtype=dtype)
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+# Streams an Excel report in chunks of rows, memory stays the same no matter how long the report is
+# @param: [str] filename: path of the .xlsx file to be read
+#         [dict] dtype: column names mapped to the data type they should be read as
+#         [int] size: max number of rows in each chunk
+# @return: [generator] dataframes of consecutive rows, indexed by their row number in the report
+# Raises a ValueError when a row has cells past the last column with a header
+def iter_spreadsheet(filename, dtype, size=chunk_size):
+    workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # exports from the web apps don't always record the size of the sheet correctly
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        # name empty and repeated headers the same way pandas does
+        columns = _name_columns(header)
+        types = {column: kind for column, kind in dtype.items() if column in columns}
+
+        rows = _pad_rows(rows, len(columns))
+        start = 0
+        while True:
+            records = list(islice(rows, size))
+            if not records:
+                break
+            chunk = pd.DataFrame.from_records(records, columns=columns,
+                                              index=pd.RangeIndex(start, start + len(records)))
+            chunk = chunk.astype(types)
+            # empty cells are NaN, the same as pd.read_excel
+            chunk = chunk.where(chunk.notna(), np.nan)
+            start += len(records)
+            yield chunk
+    finally:
+        workbook.close()
+
+# Names the columns like pandas' header parsing: an empty header is 'Unnamed: <position>', and a repeated
+#   name gets the first free '.1', '.2'... suffix, given names before the unnamed ones
+# @param: [tuple] header: values in the first row
+# @return: [list] unique column names
+def _name_columns(header):
+    columns = [("Unnamed: %d" % i) if value in (None, "") else str(value) for i, value in enumerate(header)]
+    unnamed = [i for i, value in enumerate(header) if value in (None, "")]
+    counts = {}
+    for i in [i for i in range(len(columns)) if i not in unnamed] + unnamed:
+        name = column = columns[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            column = "%s.%d" % (name, count)
+            count = count + 1 if column in columns else counts.get(column, 0)
+        columns[i] = column
+        counts[column] = count + 1
+    return columns
+
+class _RowWiderThanHeader(ValueError):
+    pass
+
+# Cuts every row to the width of the header and pads out rows that end in empty cells. Blank rows
+#   are only kept when there's another row after them, the same as pd.read_excel
+# @param: [generator] rows: values of every row after the header
+#         [int] width: number of columns
+# @return: [generator] rows of exactly 'width' values
+def _pad_rows(rows, width):
+    blank_rows = 0
+    for number, row in enumerate(rows, start=2):
+        if any(value is not None for value in row[width:]):
+            raise _RowWiderThanHeader("Row " + str(number) + " has cells past the last column with a header")
+        row = tuple(row[:width]) + (None,) * (width - len(row))
+        if all(value is None for value in row):
+            blank_rows += 1
+            continue
+        for i in range(blank_rows):
+            yield (None,) * width
+        blank_rows = 0
+        yield row
+
+def _calamine_installed():
+    try:
+        import python_calamine
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,75 @@
+import threading
+import json
+import os
+
+'''
+Learns how long each named wait in the drivers usually takes, so the timeout of every wait
+follows how fast the website actually is instead of one fixed number. Each timeout is a high
+percentile of the most recent waits with some room to spare, kept between a floor and a ceiling.
+A wait that times out starts the window over from its timeout, so the very next wait of that name
+gets twice as long, and it stays that long until the slow waits have moved out of the window.
+
+The timings are saved to a JSON file so every run starts with what the last run learned.
+'''
+class WaitTimeouts:
+    # bounds of every timeout, in seconds, no wait gets less than the drivers' old fixed 'wait_time'
+    floor = 3
+    ceiling = 30
+
+    percentile = 0.95
+    # how much longer than the percentile a wait is allowed to take
+    margin = 2
+    # number of most recent waits kept for each name
+    window = 50
+    # number of waits needed before the timeout is learned instead of the default
+    min_samples = 5
+
+    # @param: [str] filename: JSON file the timings are saved to, None to only keep them in memory
+    #         [int] default: timeout of a wait that hasn't been seen enough yet
+    def __init__(self, filename=None, default=3):
+        self.filename = filename
+        self.default = default
+        self.lock = threading.Lock()
+        self.samples = {}
+
+        if self.filename and os.path.exists(self.filename):
+            try:
+                with open(self.filename) as f:
+                    self.samples = json.load(f)
+            except ValueError:
+                print("Couldn't read saved wait timings, starting over")
+
+    # @param: [str] name: name of the wait
+    # @return: [float] timeout of the wait in seconds
+    def get(self, name):
+        with self.lock:
+            samples = sorted(self.samples.get(name, []))
+        if len(samples) < self.min_samples:
+            return self.default
+        latency = samples[min(len(samples) - 1, int(len(samples) * self.percentile))]
+        return min(self.ceiling, max(self.floor, latency * self.margin))
+
+    # Records how long a wait took
+    # @param: [str] name: name of the wait
+    #         [float] seconds: how long the wait took, or its timeout if it timed out
+    #         [bool] timed_out: whether the wait timed out
+    def record(self, name, seconds, timed_out=False):
+        with self.lock:
+            if timed_out:
+                # the learned timeout was too short, start over as if every wait took the whole timeout
+                self.samples[name] = [round(seconds, 3)] * self.min_samples
+            else:
+                samples = self.samples.setdefault(name, [])
+                samples.append(round(seconds, 3))
+                del samples[:-self.window]
+        if timed_out:
+            print("Waited " + str(round(seconds, 1)) + "s for '" + name + "', next time will wait up to "
+                  + str(round(self.get(name), 1)) + "s")
+
+    # Saves the timings so the next run starts with them
+    def save(self):
+        if not self.filename:
+            return
+        with self.lock:
+            with open(self.filename, 'w') as f:
+                json.dump(self.samples, f, indent=4)
@@ -0,0 +1,16 @@
+import json
+import os
+import pytest
+import sys
+
+# the scripts in salt/ import each other as top level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "salt"))
+
+# DailyData reads its settings relative to the working directory, everything it writes goes in 'tmp_path'
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    os.makedirs(os.path.join(str(tmp_path), "salt"))
+    with open(os.path.join(str(tmp_path), "salt", "settings.json"), 'w') as f:
+        json.dump({"data": [{"hmis_username": "", "hmis_password": "", "output_path": str(tmp_path) + os.sep}]}, f)
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path)
@@ -0,0 +1,59 @@
+import os
+import client_cache
+
+def test_client_round_trip(tmp_path):
+    filename = os.path.join(str(tmp_path), "client_cache.db")
+    cache = client_cache.ClientCache(filename)
+    cache.remember("James", "Powell", "01-31-1970", ("123", "James", "Powell", 1.0))
+    cache.close()
+
+    cache = client_cache.ClientCache(filename)
+    # names are looked up the way name_matcher normalizes them
+    assert cache.find_client_id("james", " POWELL", "01-31-1970") == "123"
+    assert cache.find_client_id("James", "Powell", "02-01-1970") is None
+    assert cache.find_verified_name("123", "James", "Powell") == ("James", "Powell")
+    assert cache.find_verified_name("456", "James", "Powell") is None
+
+def test_unconfident_match_not_used(tmp_path):
+    cache = client_cache.ClientCache(os.path.join(str(tmp_path), "client_cache.db"))
+    cache.remember("James", "Powell", "01-31-1970", ("123", "Jim", "Powel", client_cache.ClientCache.min_confidence / 2))
+    assert cache.find_client_id("James", "Powell", "01-31-1970") is None
+    assert cache.find_verified_name("123", "James", "Powell") is None
+
+def test_forget(tmp_path):
+    cache = client_cache.ClientCache(os.path.join(str(tmp_path), "client_cache.db"))
+    cache.remember("James", "Powell", "01-31-1970", ("123", "James", "Powell", 1.0))
+    cache.forget("James", "Powell", "01-31-1970", "123")
+    assert cache.find_client_id("James", "Powell", "01-31-1970") is None
+    assert cache.find_verified_name("123", "James", "Powell") is None
+
+# entries that haven't been used in 'max_age' days are dropped when the cache is opened
+def test_old_entries_evicted(tmp_path):
+    filename = os.path.join(str(tmp_path), "client_cache.db")
+    cache = client_cache.ClientCache(filename)
+    cache.remember("James", "Powell", "01-31-1970", ("123", "James", "Powell", 1.0))
+    cache.remember("Ana", "Lopez", "02-01-1980", ("456", "Ana", "Lopez", 1.0))
+    cache.connection.execute("UPDATE clients SET used_at = '2000-01-01T00:00:00' WHERE client_id = '123'")
+    cache.connection.execute("UPDATE verified_names SET used_at = '2000-01-01T00:00:00' WHERE client_id = '123'")
+    cache.connection.commit()
+    cache.close()
+
+    cache = client_cache.ClientCache(filename)
+    assert cache.find_client_id("James", "Powell", "01-31-1970") is None
+    assert cache.find_client_id("Ana", "Lopez", "02-01-1980") == "456"
+
+def test_enrollment_round_trip(tmp_path):
+    filename = os.path.join(str(tmp_path), "client_cache.db")
+    cache = client_cache.ClientCache(filename)
+    cache.remember_enrollment("123", "ORL", ("7", "SALT Outreach-ORL ESG Street Outreach"))
+    cache.close()
+
+    cache = client_cache.ClientCache(filename)
+    assert cache.find_enrollment("123", "ORL") == "7"
+    # kept apart for every location
+    assert cache.find_enrollment("123", "SEM") is None
+
+    cache.remember_enrollment("123", "ORL", ("9", "SALT Outreach-ORL CDBG Services Only"))
+    assert cache.find_enrollment("123", "ORL") == "9"
+    cache.forget_enrollment("123", "ORL")
+    assert cache.find_enrollment("123", "ORL") is None
@@ -0,0 +1,18 @@
+import os
+import pytest
+import daily_data
+import report_fingerprints
+import report_generator
+import session_pool
+
+# a re-download of a report that was entered completely skips HMIS, but the manual sheet is still exported
+def test_processed_report_still_exports_manual_sheet(settings, monkeypatch):
+    report = report_generator.ReportGenerator("ORL", 20).write(settings, "03-01-2024")
+    fingerprints = report_fingerprints.ReportFingerprints(os.path.join(settings, "processed_reports.db"), "ORL", "03-01-2024")
+    fingerprints.mark_file_processed(report_fingerprints.hash_file(report))
+    fingerprints.close()
+    monkeypatch.setattr(session_pool.SessionPool, "start", lambda self: pytest.fail("browsers were started"))
+
+    daily_data.DailyData(report, True, True, False, "ORL", False, work_list=True).read_and_process_data()
+    assert os.path.exists(os.path.join(settings, "01 Mar 2024 - ORL.xlsx"))
+    assert os.path.exists(os.path.join(settings, "ORL_Work_list_03-01-2024.json"))
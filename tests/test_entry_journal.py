@@ -0,0 +1,39 @@
+import os
+import entry_journal
+
+def test_resumes_unfinished_run(tmp_path):
+    filename = os.path.join(str(tmp_path), "journal.jsonl")
+    journal = entry_journal.EntryJournal(filename, "report.xlsx")
+    journal.record(0, True, "A")
+    journal.record(1, False, "B")
+    journal.record(2, True, "C")
+    journal.file.close()
+
+    resumed = entry_journal.EntryJournal(filename, "report.xlsx")
+    assert resumed.successful_rows == {0, 2}
+    resumed.finish()
+
+def test_finished_or_other_report_starts_over(tmp_path):
+    filename = os.path.join(str(tmp_path), "journal.jsonl")
+    journal = entry_journal.EntryJournal(filename, "report.xlsx")
+    journal.record(0, True)
+    journal.finish()
+    assert entry_journal.EntryJournal(filename, "report.xlsx").successful_rows == set()
+
+    journal = entry_journal.EntryJournal(filename, "report.xlsx")
+    journal.record(0, True)
+    journal.file.close()
+    assert entry_journal.EntryJournal(filename, "other_report.xlsx").successful_rows == set()
+
+# a line cut off by the process being killed is skipped and the journal carries on from the next line
+def test_cut_off_line(tmp_path):
+    filename = os.path.join(str(tmp_path), "journal.jsonl")
+    journal = entry_journal.EntryJournal(filename, "report.xlsx")
+    journal.record(0, True)
+    journal.file.write('{"event": "entry", "row": 1, "succ')
+    journal.file.close()
+
+    resumed = entry_journal.EntryJournal(filename, "report.xlsx")
+    resumed.record(2, True)
+    resumed.file.close()
+    assert entry_journal.EntryJournal(filename, "report.xlsx").successful_rows == {0, 2}
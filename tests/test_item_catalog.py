@@ -0,0 +1,24 @@
+import pandas as pd
+import item_catalog
+
+def test_match_totals_items_by_category():
+    matcher = item_catalog.ItemMatcher("ORL")
+    totals = matcher.match("TOP: 1, SKS: 12, Diabetic Socks: 2, DDR: 3, SBG: 1")
+    assert totals == {'Clothing': 15, 'Grooming': 3, 'Food': 1, 'Bedding': 0}
+
+def test_match_empty_cell():
+    assert item_catalog.ItemMatcher("SEM").match(float('nan')) == {'Clothing': 0, 'Grooming': 0, 'Food': 0, 'Bedding': 0}
+
+# every item is only counted once, 'Women's Top' isn't also counted as 'Men's Top'
+def test_each_item_counted_once():
+    matcher = item_catalog.ItemMatcher("SEM")
+    counts = matcher.count_items(pd.Series(["Women's Top: 2, Men's Top: 1, Tent: 10", None]))
+    assert counts.loc[0].to_dict() == {'Clothing': 3, 'Grooming': 0, 'Food': 0, 'Bedding': 10}
+    assert counts.loc[1].sum() == 0
+
+def test_count_services_matches_match():
+    matcher = item_catalog.ItemMatcher("ORL")
+    services = matcher.count_services(pd.Series(["Shower: 1, Laundry: 2", "Case Management: 1", None], index=[4, 5, 6]))
+    assert list(services.index) == [4, 5, 6]
+    assert services.loc[4].to_dict() == {'Shower': 1, 'Laundry': 2, 'Case Management': 0}
+    assert services.loc[5, 'Case Management'] == 1
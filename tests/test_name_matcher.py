@@ -0,0 +1,12 @@
+import run_name_matcher_benchmark as benchmark
+
+def test_agrees_with_difflib_on_labeled_names():
+    assert benchmark.check_agreement()
+
+def test_labeled_dashboards():
+    for client, dashboard, expected in benchmark.labeled_dashboards:
+        assert benchmark.name_matcher_matches(*client, *dashboard) == expected, (client, dashboard)
+
+def test_labeled_results():
+    for client, results, expected in benchmark.labeled_results:
+        assert benchmark.name_matcher_best_result(*client, results) == expected, (client, results)
@@ -0,0 +1,36 @@
+import os
+import report_fingerprints
+
+def test_processed_file(tmp_path):
+    filename = os.path.join(str(tmp_path), "processed_reports.db")
+    fingerprints = report_fingerprints.ReportFingerprints(filename, "ORL", "03-01-2024")
+    assert not fingerprints.file_processed("abc")
+    fingerprints.mark_file_processed("abc")
+    fingerprints.close()
+
+    assert report_fingerprints.ReportFingerprints(filename, "ORL", "03-01-2024").file_processed("abc")
+    # kept apart for every location and date
+    assert not report_fingerprints.ReportFingerprints(filename, "SEM", "03-01-2024").file_processed("abc")
+    assert not report_fingerprints.ReportFingerprints(filename, "ORL", "03-02-2024").file_processed("abc")
+
+def test_delta_of_re_exported_report(tmp_path):
+    filename = os.path.join(str(tmp_path), "processed_reports.db")
+    fingerprints = report_fingerprints.ReportFingerprints(filename, "ORL", "03-01-2024")
+    assert fingerprints.get_delta("id:1", {'Shower': 1}) == ('new', {'Shower': 1})
+    fingerprints.record_client("id:1", {'Shower': 1, 'Laundry': 2})
+    fingerprints.close()
+
+    fingerprints = report_fingerprints.ReportFingerprints(filename, "ORL", "03-01-2024")
+    assert fingerprints.get_delta("id:1", {'Laundry': 2, 'Shower': 1}) == ('unchanged', {})
+    assert fingerprints.get_delta("id:1", {'Shower': 2, 'Laundry': 2, 'Food': 1}) == ('changed', {'Shower': 1, 'Food': 1})
+    assert fingerprints.get_delta("id:2", {'Shower': 1}) == ('new', {'Shower': 1})
+
+def test_hash_file(tmp_path):
+    a, b = os.path.join(str(tmp_path), "a.xlsx"), os.path.join(str(tmp_path), "b.xlsx")
+    for filename, contents in ((a, b"report"), (b, b"report")):
+        with open(filename, 'wb') as f:
+            f.write(contents)
+    assert report_fingerprints.hash_file(a) == report_fingerprints.hash_file(b)
+    with open(b, 'ab') as f:
+        f.write(b" with a late entry")
+    assert report_fingerprints.hash_file(a) != report_fingerprints.hash_file(b)
@@ -0,0 +1,37 @@
+import os
+import service_ledger
+
+def test_saved_services_round_trip(tmp_path):
+    filename = os.path.join(str(tmp_path), "service_ledger.db")
+    ledger = service_ledger.ServiceLedger(filename, "ORL", "03-01-2024")
+    ledger.record("id:1", "Shower", 1)
+    ledger.record("id:1", "Laundry", 2)
+    ledger.record("id:1", "Laundry", 1)
+    ledger.close()
+
+    ledger = service_ledger.ServiceLedger(filename, "ORL", "03-01-2024")
+    assert ledger.saved_services("id:1") == {'Shower': 1, 'Laundry': 3}
+    assert ledger.saved_services("id:2") == {}
+    # kept apart for every location and date
+    assert service_ledger.ServiceLedger(filename, "SEM", "03-01-2024").saved_services("id:1") == {}
+    assert service_ledger.ServiceLedger(filename, "ORL", "03-02-2024").saved_services("id:1") == {}
+
+# a client that failed partway through only gets what wasn't saved when the report is run again
+def test_saved_service_excluded_on_rerun(tmp_path):
+    filename = os.path.join(str(tmp_path), "service_ledger.db")
+    services = {'Shower': 1, 'Laundry': 2, 'Food': 1}
+    ledger = service_ledger.ServiceLedger(filename, "ORL", "03-01-2024")
+    assert ledger.get_missing("id:1", services, services) == services
+    ledger.record("id:1", "Shower", 1)
+    ledger.record("id:1", "Laundry", 1)
+    ledger.close()
+
+    ledger = service_ledger.ServiceLedger(filename, "ORL", "03-01-2024")
+    assert ledger.get_missing("id:1", services, services) == {'Laundry': 1, 'Food': 1}
+
+# a re-exported report only enters the increase, minus whatever part of it was already saved
+def test_missing_increase(tmp_path):
+    ledger = service_ledger.ServiceLedger(os.path.join(str(tmp_path), "service_ledger.db"), "ORL", "03-01-2024")
+    ledger.record("id:1", "Shower", 1)
+    ledger.record("id:1", "Shower", 1)
+    assert ledger.get_missing("id:1", {'Shower': 2}, {'Shower': 3}) == {'Shower': 1}
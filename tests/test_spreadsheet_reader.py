@@ -0,0 +1,59 @@
+import os
+import openpyxl
+import pandas as pd
+import pytest
+import daily_data
+import report_generator
+import spreadsheet_reader
+
+dtype = {'': object, 'DoB': object, 'Client Name': object, 'HMIS ID': object, 'Race': object, 'Ethnicity': object,
+         'Verification of homeless': object, 'Gross monthly income': object, 'Service': object, 'Items': object}
+
+def test_column_names_like_pandas():
+    assert spreadsheet_reader._name_columns(("", "A", "A", "A.1", None)) == ["Unnamed: 0", "A", "A.2", "A.1", "Unnamed: 4"]
+    assert spreadsheet_reader._name_columns((None, "Unnamed: 0", "A")) == ["Unnamed: 0.1", "Unnamed: 0", "A"]
+
+def write_workbook(filename, rows):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(filename)
+
+# blank rows keep their place unless they're at the end, so row indexes line up with pd.read_excel
+def test_blank_rows_like_pandas(tmp_path, monkeypatch):
+    monkeypatch.setattr(spreadsheet_reader, "_calamine_installed", lambda: False)
+    filename = os.path.join(str(tmp_path), "blank_rows.xlsx")
+    write_workbook(filename, [['Client Name', 'Service'], ['A', 'SH'], [None, None], ['B', 'LA'], [None, None]])
+
+    streamed = spreadsheet_reader.read_spreadsheet(filename, {'Client Name': object, 'Service': object})
+    expected = pd.read_excel(filename, dtype={'Client Name': object, 'Service': object})
+    assert len(streamed.index) == 3
+    pd.testing.assert_frame_equal(streamed, expected)
+
+# cells without a header can't be streamed, the whole workbook is read like before instead
+def test_cells_past_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(spreadsheet_reader, "_calamine_installed", lambda: False)
+    filename = os.path.join(str(tmp_path), "wide_row.xlsx")
+    write_workbook(filename, [['Client Name', 'Service'], ['A', 'SH'], ['B', 'LA', 'extra']])
+
+    with pytest.raises(ValueError):
+        list(spreadsheet_reader.iter_spreadsheet(filename, {}))
+    streamed = spreadsheet_reader.read_spreadsheet(filename, {})
+    assert list(streamed.columns) == ['Client Name', 'Service', 'Unnamed: 2']
+    assert streamed.loc[1, 'Unnamed: 2'] == 'extra'
+
+# The failed entries report is written with its index, so its blank index header ends up next to
+# the 'Unnamed: 0' column of the original report. Rerunning it has to work the same as pandas.
+def test_failed_entries_round_trip(tmp_path, monkeypatch, settings):
+    monkeypatch.setattr(spreadsheet_reader, "_calamine_installed", lambda: False)
+    report = report_generator.ReportGenerator("ORL", 50).write(str(tmp_path), "03-01-2024")
+    failed_entries = os.path.join(str(tmp_path), "ORL_Failed_entries_03-01-2024.xlsx")
+    spreadsheet_reader.read_spreadsheet(report, dtype).to_excel(failed_entries, sheet_name="Failed Entries")
+
+    streamed = spreadsheet_reader.read_spreadsheet(failed_entries, dtype)
+    expected = pd.read_excel(failed_entries, dtype=dtype)
+    assert list(streamed.columns) == list(expected.columns)
+    assert streamed.columns.is_unique
+
+    daily_data.DailyData(failed_entries, False, True, False, "ORL", False).read_and_process_data()
+    assert os.path.exists(os.path.join(str(tmp_path), "01 Mar 2024 - ORL.xlsx"))
@@ -0,0 +1,23 @@
+import wait_timeouts
+
+def test_learned_timeout_stays_above_floor():
+    timeouts = wait_timeouts.WaitTimeouts(default=3)
+    for i in range(10):
+        timeouts.record("search", 0.2)
+    assert timeouts.get("search") == wait_timeouts.WaitTimeouts.floor
+
+def test_timeout_raises_next_timeout():
+    timeouts = wait_timeouts.WaitTimeouts(default=3)
+    for i in range(wait_timeouts.WaitTimeouts.window):
+        timeouts.record("search", 2)
+    assert timeouts.get("search") == 4
+
+    timeouts.record("search", 4, timed_out=True)
+    assert timeouts.get("search") == 8
+    timeouts.record("search", 2)
+    assert timeouts.get("search") == 8
+
+def test_timeout_before_enough_samples_raises_default():
+    timeouts = wait_timeouts.WaitTimeouts(default=3)
+    timeouts.record("search", 3, timed_out=True)
+    assert timeouts.get("search") == 6